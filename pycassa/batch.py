@@ -4,9 +4,22 @@ import threading
 from pycassa.cassandra.ttypes import (Column, ColumnOrSuperColumn,
                                       ConsistencyLevel, Deletion, Mutation,
                                       SlicePredicate, SuperColumn)
+from pycassa.wire import (encode_column_mutations,
+                          encode_super_column_mutation, encode_mutation)
 
 __all__ = ['Mutator', 'CfMutator']
 
+def _as_str(value):
+    """
+    Copies a :class:`buffer`, :class:`bytearray` or :class:`memoryview`
+    value into a str, which is all the generated Thrift code accepts.
+    """
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    if isinstance(value, (buffer, bytearray)):
+        return str(value)
+    return value
+
 class Mutator(object):
     """
     Batch update convenience mechanism.
@@ -16,7 +29,8 @@ class Mutator(object):
 
     """
 
-    def __init__(self, client, queue_size=100, write_consistency_level=None):
+    def __init__(self, client, queue_size=100, write_consistency_level=None,
+                 direct_writes=False):
         """Creates a new Mutator object.
 
         :Parameters:
@@ -27,12 +41,20 @@ class Mutator(object):
                 automatically.
             `write_consistency_level`: :class:`~pycassa.cassandra.ttypes.ConsistencyLevel`
                 The Cassandra write consistency level.
+            `direct_writes`: bool
+                Whether mutations should be serialized as they are queued
+                and sent with :meth:`~pycassa.wire.Client.batch_mutate_direct()`
+                instead of being built from Thrift objects.  This requires a
+                connection from :mod:`pycassa.connection` or :mod:`pycassa.pool`.
 
         """
         self._buffer = []
+        # The row caches and keys to invalidate once the buffer is sent
+        self._invalidations = []
         self._lock = threading.RLock()
         self.client = client
         self.limit = queue_size
+        self.direct_writes = direct_writes
         if write_consistency_level is None:
             self.write_consistency_level = ConsistencyLevel.ONE
         else:
@@ -49,6 +71,10 @@ class Mutator(object):
         try:
             mutation = (key, column_family.column_family, mutations)
             self._buffer.append(mutation)
+            if column_family.row_cache is not None:
+                self._invalidations.append((column_family.row_cache, key))
+            if column_family.negative_cache is not None:
+                self._invalidations.append((column_family.negative_cache, key))
             if self.limit and len(self._buffer) >= self.limit:
                 self.send()
         finally:
@@ -63,35 +89,98 @@ class Mutator(object):
         try:
             for key, column_family, cols in self._buffer:
                 mutations.setdefault(key, {}).setdefault(column_family, []).extend(cols)
-            if mutations:
-                self.client.batch_mutate(mutations, write_consistency_level)
+            try:
+                if mutations:
+                    if self.direct_writes:
+                        self.client.batch_mutate_direct(mutations, write_consistency_level)
+                    else:
+                        self.client.batch_mutate(mutations, write_consistency_level)
+            finally:
+                # A batch that failed may still have been partly applied
+                for cache, key in self._invalidations:
+                    cache.invalidate(key)
             self._buffer = []
+            self._invalidations = []
         finally:
             self._lock.release()
 
-    def _make_mutations_insert(self, column_family, columns, timestamp, ttl):
-        _pack_name = column_family._pack_name
-        _pack_value = column_family._pack_value
+    def _pack_columns(self, column_family, columns):
+        """
+        Yields packed ``(name, value)`` pairs for standard columns, or
+        ``(super column name, [(name, value)])`` for super columns.
+        """
+        pack_name = column_family._get_name_packer()
+        if column_family._pack_values:
+            get_value_packer = column_family._value_packers.get
+            default_value_packer = column_family._default_value_packer
+        else:
+            get_value_packer = None
+        # Value packers are kept under packed column names, as they are
+        # looked up when reading
         for c, v in columns.iteritems():
+            if column_family.super:
+                subc = []
+                for subname, subvalue in v.iteritems():
+                    subname = pack_name(subname)
+                    if get_value_packer is not None:
+                        subvalue = get_value_packer(subname, default_value_packer)(subvalue)
+                    subc.append((subname, subvalue))
+                yield column_family._pack_name(c, True), subc
+            else:
+                c = pack_name(c)
+                if get_value_packer is not None:
+                    v = get_value_packer(c, default_value_packer)(v)
+                yield c, v
+
+    def _raw_columns(self, column_family, columns):
+        """
+        Yields already packed columns in the form of :meth:`_pack_columns()`.
+        """
+        for name, value in columns.iteritems():
+            if column_family.super:
+                value = value.items()
+            yield name, value
+
+    def _make_mutations_insert(self, column_family, columns, timestamp, ttl,
+                               raw=False):
+        if raw:
+            packed = self._raw_columns(column_family, columns)
+        else:
+            packed = self._pack_columns(column_family, columns)
+        if self.direct_writes:
+            if column_family.super:
+                return [encode_super_column_mutation(name, subc, timestamp, ttl)
+                        for name, subc in packed]
+            return encode_column_mutations(packed, timestamp, ttl)
+
+        mutations = []
+        for name, value in packed:
             cos = ColumnOrSuperColumn()
             if column_family.super:
-                subc = [Column(name=_pack_name(subname),
-                               value=_pack_value(subvalue, subname),
+                subc = [Column(name=subname, value=_as_str(subvalue),
                                timestamp=timestamp, ttl=ttl)
-                            for subname, subvalue in v.iteritems()]
-                cos.super_column = SuperColumn(name=_pack_name(c, True),
-                                               columns=subc)
+                            for subname, subvalue in value]
+                cos.super_column = SuperColumn(name=name, columns=subc)
             else:
-                cos.column = Column(name=_pack_name(c), value=_pack_value(v, c),
+                if type(value) is not str:
+                    value = _as_str(value)
+                cos.column = Column(name=name, value=value,
                                     timestamp=timestamp, ttl=ttl)
-            yield Mutation(column_or_supercolumn=cos)
+            mutations.append(Mutation(column_or_supercolumn=cos))
+        return mutations
 
-    def insert(self, column_family, key, columns, timestamp=None, ttl=None):
+    def insert(self, column_family, key, columns, timestamp=None, ttl=None,
+               raw=False):
+        """
+        Queues the insertion of `columns` into row `key`.  If `raw` is set,
+        the names and values in `columns` are already packed and are
+        written as they are.
+        """
         if columns:
             if timestamp == None:
                 timestamp = column_family.timestamp()
             mutations = self._make_mutations_insert(column_family, columns,
-                                                    timestamp, ttl)
+                                                    timestamp, ttl, raw)
             self._enqueue(key, column_family, mutations)
         return self
 
@@ -107,6 +196,8 @@ class Mutator(object):
             if super_column:
                 deletion.super_column = super_column
         mutation = Mutation(deletion=deletion)
+        if self.direct_writes:
+            mutation = encode_mutation(mutation)
         self._enqueue(key, column_family, (mutation,))
         return self
 
@@ -117,7 +208,8 @@ class CfMutator(Mutator):
 
     """
 
-    def __init__(self, column_family, queue_size=100, write_consistency_level=None):
+    def __init__(self, column_family, queue_size=100, write_consistency_level=None,
+                 direct_writes=None):
         """Creates a new CfMutator object.
 
         :Parameters:
@@ -128,16 +220,23 @@ class CfMutator(Mutator):
                 automatically.
             `write_consistency_level`: :class:`~pycassa.cassandra.ttypes.ConsistencyLevel`
                 The Cassandra write consistency level.
+            `direct_writes`: bool
+                Whether mutations should be serialized directly.  Defaults
+                to the column family's `direct_writes` setting.
 
         """
         wcl = write_consistency_level or column_family.write_consistency_level
+        if direct_writes is None:
+            direct_writes = column_family.direct_writes
         super(CfMutator, self).__init__(column_family.client, queue_size=queue_size,
-                                        write_consistency_level=wcl)
+                                        write_consistency_level=wcl,
+                                        direct_writes=direct_writes)
         self._column_family = column_family
 
-    def insert(self, key, cols, timestamp=None, ttl=None):
+    def insert(self, key, cols, timestamp=None, ttl=None, raw=False):
         return super(CfMutator, self).insert(self._column_family, key, cols,
-                                             timestamp=timestamp, ttl=ttl)
+                                             timestamp=timestamp, ttl=ttl,
+                                             raw=raw)
 
     def remove(self, key, columns=None, super_column=None, timestamp=None):
         return super(CfMutator, self).remove(self._column_family, key,
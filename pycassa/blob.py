@@ -0,0 +1,241 @@
+"""
+Storage of values too large for a single column.
+
+A :class:`BlobStore` splits each value into fixed-size chunks which are
+stored as consecutive columns of one row, so no single request has to
+carry the whole value.  Values are read back through a file-like
+:class:`BlobReader`, which only holds a few chunks in memory at a time.
+
+"""
+
+from collections import deque
+
+from pycassa.cassandra.ttypes import NotFoundException
+from pycassa.workers import shared_pool
+
+__all__ = ['BlobStore', 'BlobReader']
+
+class BlobStore(object):
+    """
+    Stores large values in a :class:`~pycassa.columnfamily.ColumnFamily`,
+    one value per row.
+
+    Chunk columns are named by their position.  With a ``LongType`` or
+    ``IntegerType`` comparator the names are integers; otherwise they are
+    zero-padded decimal strings, so the column family should compare names
+    as bytes or text.  Super column families are not supported.
+
+    Writing a value is not atomic: a reader may see a value that is only
+    partially written.
+
+    """
+
+    def __init__(self, column_family, chunk_size=262144, queue_size=4,
+                 page_size=4, prefetch=True, workers=None):
+        """
+        :Parameters:
+            `column_family`: :class:`~pycassa.columnfamily.ColumnFamily`
+                The column family to store values in
+            `chunk_size`: int
+                The size of each chunk in bytes
+            `queue_size`: int
+                The number of chunks sent in each ``batch_mutate`` call
+            `page_size`: int
+                The number of chunks fetched by each read
+            `prefetch`: bool
+                Whether readers should fetch the next page of chunks on a
+                worker thread while the current page is being read.  This
+                requires a client that may be used from several threads;
+                see :mod:`pycassa.workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers used to prefetch pages.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+        """
+        if column_family.super:
+            raise TypeError('blobs cannot be stored in a super column family')
+        self.column_family = column_family
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.workers = workers
+
+    def _chunk_name(self, index):
+        if self.column_family.col_name_data_type in ('LongType', 'IntegerType'):
+            return index
+        return '%010d' % index
+
+    def _iter_chunks(self, data):
+        if not hasattr(data, 'read'):
+            for start in xrange(0, len(data), self.chunk_size):
+                yield data[start:start + self.chunk_size]
+            return
+        while True:
+            chunk = data.read(self.chunk_size)
+            # Short reads are allowed, so keep reading until the chunk is full
+            while chunk and len(chunk) < self.chunk_size:
+                more = data.read(self.chunk_size - len(chunk))
+                if not more:
+                    break
+                chunk += more
+            if not chunk:
+                return
+            yield chunk
+
+    def put(self, key, data, ttl=None, write_consistency_level=None):
+        """
+        Stores a value, replacing any value already stored under `key`.
+
+        :Parameters:
+            `key`: str
+                The key to store the value under
+            `data`: str or file
+                The value, or a file-like object to read it from
+            `ttl`: int
+                Time to live for the chunk columns
+            `write_consistency_level`: :class:`~pycassa.cassandra.ttypes.ConsistencyLevel`
+                Affects the guaranteed replication factor before returning from
+                any write operation
+
+        :Returns:
+            int length of the value in bytes
+        """
+        timestamp = self.column_family.timestamp()
+        batch = self.column_family.batch(queue_size=self.queue_size,
+                                         write_consistency_level=write_consistency_level)
+        # Deleting the row first removes the chunks of a longer old value;
+        # the new chunks are written with a later timestamp so they survive
+        batch.remove(key, timestamp=timestamp)
+        index = 0
+        length = 0
+        for chunk in self._iter_chunks(data):
+            batch.insert(key, {self._chunk_name(index): chunk},
+                         timestamp=timestamp + 1, ttl=ttl)
+            index += 1
+            length += len(chunk)
+        if index == 0:
+            # An empty value still needs a row
+            batch.insert(key, {self._chunk_name(0): ''},
+                         timestamp=timestamp + 1, ttl=ttl)
+        batch.send()
+        return length
+
+    def open(self, key, read_consistency_level=None):
+        """
+        Opens a stored value for reading.
+
+        Raises :exc:`~pycassa.cassandra.ttypes.NotFoundException` if no value
+        is stored under `key`.
+
+        :Returns:
+            :class:`BlobReader`
+        """
+        return BlobReader(self, key, read_consistency_level)
+
+    def get(self, key, read_consistency_level=None):
+        """ Returns a whole stored value as a string. """
+        return self.open(key, read_consistency_level).read()
+
+    def remove(self, key, write_consistency_level=None):
+        """ Removes the value stored under `key`. """
+        return self.column_family.remove(key,
+                write_consistency_level=write_consistency_level)
+
+class BlobReader(object):
+    """
+    A read-only, file-like view of a value in a :class:`BlobStore`.
+
+    Chunks are fetched `page_size` at a time as they are needed.
+
+    """
+
+    def __init__(self, store, key, read_consistency_level=None):
+        self.store = store
+        self.key = key
+        self.read_consistency_level = read_consistency_level
+        self._chunks = deque()
+        self._chunk = ''
+        self._offset = 0
+        self._position = 0
+        self._next_index = 0
+        self._pending = None
+        self._done = False
+        self._workers = None
+        if store.prefetch:
+            self._workers = store.workers or shared_pool()
+        if not self._load_page():
+            raise NotFoundException()
+
+    def _get_page(self, index):
+        """Fetches the values of the chunks starting at `index`."""
+        store = self.store
+        columns = store.column_family.get(self.key,
+                column_start=store._chunk_name(index),
+                column_count=store.page_size,
+                read_consistency_level=self.read_consistency_level,
+                raw=True)
+        pack_name = store.column_family._pack_name
+        values = []
+        for name, value in columns:
+            if name != pack_name(store._chunk_name(index)):
+                raise IOError('chunk %d of %r is missing' % (index, self.key))
+            values.append(value)
+            index += 1
+        return values
+
+    def _load_page(self):
+        """Moves on to the next page of chunks; returns False at the end."""
+        if self._done:
+            return False
+        if self._pending is not None:
+            pending = self._pending
+            self._pending = None
+            page = pending.result()
+        else:
+            page = self._get_page(self._next_index)
+        self._next_index += len(page)
+        if len(page) < self.store.page_size:
+            self._done = True
+        elif self._workers is not None:
+            self._pending = self._workers.submit(self._get_page, self._next_index)
+        self._chunks.extend(page)
+        return len(page) > 0
+
+    def read(self, size=-1):
+        """
+        Reads up to `size` bytes, or everything that is left if `size` is
+        negative.  An empty string is returned at the end of the value.
+        """
+        parts = []
+        while size != 0:
+            if self._offset >= len(self._chunk):
+                if not self._chunks and not self._load_page():
+                    break
+                self._chunk = self._chunks.popleft()
+                self._offset = 0
+                continue
+            if size < 0:
+                end = len(self._chunk)
+            else:
+                end = min(len(self._chunk), self._offset + size)
+                size -= end - self._offset
+            if self._offset == 0 and end == len(self._chunk):
+                parts.append(self._chunk)
+            else:
+                parts.append(self._chunk[self._offset:end])
+            self._offset = end
+        data = ''.join(parts)
+        self._position += len(data)
+        return data
+
+    def tell(self):
+        """ Returns the number of bytes read so far. """
+        return self._position
+
+    def close(self):
+        """ Releases the chunks held by the reader. """
+        self._chunks.clear()
+        self._chunk = ''
+        self._offset = 0
+        self._pending = None
+        self._done = True
@@ -0,0 +1,239 @@
+"""
+Client-side caching of rows.
+
+A :class:`RowCache` can be passed as the `row_cache` of a
+:class:`~pycassa.columnfamily.ColumnFamily` to serve repeated
+:meth:`~pycassa.columnfamily.ColumnFamily.get()` and
+:meth:`~pycassa.columnfamily.ColumnFamily.multiget()` calls from memory.
+Rows are cached per key and per slice, so reads of different columns of
+the same row are cached separately.  A :class:`NegativeCache` can be
+passed as the `negative_cache` to remember which rows are missing in the
+same way.
+
+Writes made through the column family, or through any
+:class:`~pycassa.batch.Mutator`, invalidate the rows they touch once they
+have been sent.  Writes made by other processes are only seen once the
+cached rows expire, so the `ttl` bounds how stale a cached row may be.
+
+"""
+
+import threading
+import time
+
+from pycassa.paging import estimate_size
+
+__all__ = ['RowCache', 'NegativeCache']
+
+# The fields of an entry, which is kept in a doubly linked list in order
+# of use, most recently used first
+_PREV, _NEXT, _KEY, _ROW, _SIZE, _EXPIRES = range(6)
+
+# The most row keys whose last invalidation is remembered; past this, every
+# read that started before the oldest forgotten invalidation is not cached
+_MAX_INVALIDATED = 10000
+
+class RowCache(object):
+    """
+    A least recently used cache of rows, bounded by a number of rows and
+    optionally by their estimated size in bytes.
+
+    Rows are handed out as they were cached and are shared between callers,
+    so they must not be modified.  Cached rows are returned whatever
+    consistency level is asked for.
+
+    The number of lookups that found a row is kept in :attr:`hits`, and the
+    number that did not in :attr:`misses`.
+
+    A cache should only be used by one column family.
+
+    """
+
+    def __init__(self, max_rows=10000, max_bytes=None, ttl=60):
+        """
+        :Parameters:
+            `max_rows`: int
+                The most rows to keep, counting each slice of a row
+                separately
+            `max_bytes`: int
+                The most bytes of rows to keep, as estimated by
+                :func:`~pycassa.paging.estimate_size()`, or None for no limit
+            `ttl`: float
+                The number of seconds to keep a row for, or None to keep
+                rows until they are evicted or invalidated
+        """
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Maps each row key to the keys of the entries cached for it
+        self._slices = {}
+        self._root = root = []
+        root[:] = [root, root, None, None, 0, None]
+        self._bytes = 0
+        # Bumped by every invalidation, so that a row read before a write
+        # finished is not cached after the write has invalidated it
+        self._generation = 0
+        self._invalidated = {}
+        self._floor = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def generation(self):
+        """
+        Returns a token to pass to :meth:`put()` for a row that is about to
+        be read.
+        """
+        return self._generation
+
+    def get(self, key, predicate):
+        """
+        Returns the row cached for `key` and `predicate`, or None if there
+        is none.
+        """
+        self._lock.acquire()
+        try:
+            entry = self._entries.get((key, predicate))
+            if entry is not None and entry[_EXPIRES] is not None and \
+                    entry[_EXPIRES] <= time.time():
+                self._remove(entry)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._unlink(entry)
+            self._link(entry)
+            return entry[_ROW]
+        finally:
+            self._lock.release()
+
+    def put(self, key, predicate, row, generation=None):
+        """
+        Caches `row` as the result of reading `key` with `predicate`.
+
+        If `generation` is given, it should be the result of calling
+        :meth:`generation()` before the row was read; the row is then not
+        cached if `key` has been invalidated since.
+        """
+        size = len(key) + estimate_size(row)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires = None
+        if self.ttl is not None:
+            expires = time.time() + self.ttl
+        self._lock.acquire()
+        try:
+            if generation is not None and (generation < self._floor or
+                    self._invalidated.get(key, -1) > generation):
+                return
+            cache_key = (key, predicate)
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._remove(entry)
+            entry = [None, None, cache_key, row, size, expires]
+            self._entries[cache_key] = entry
+            self._slices.setdefault(key, set()).add(cache_key)
+            self._bytes += size
+            self._link(entry)
+            self._evict()
+        finally:
+            self._lock.release()
+
+    def invalidate(self, key):
+        """ Drops every row cached for `key`. """
+        self._lock.acquire()
+        try:
+            self._generation += 1
+            if len(self._invalidated) >= _MAX_INVALIDATED:
+                self._invalidated.clear()
+                self._floor = self._generation
+            self._invalidated[key] = self._generation
+            for cache_key in list(self._slices.get(key, ())):
+                self._remove(self._entries[cache_key])
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        """ Drops every cached row. """
+        self._lock.acquire()
+        try:
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+            self._entries.clear()
+            self._slices.clear()
+            root = self._root
+            root[:] = [root, root, None, None, 0, None]
+            self._bytes = 0
+        finally:
+            self._lock.release()
+
+    def _link(self, entry):
+        root = self._root
+        first = root[_NEXT]
+        entry[_PREV] = root
+        entry[_NEXT] = first
+        first[_PREV] = entry
+        root[_NEXT] = entry
+
+    def _unlink(self, entry):
+        entry[_PREV][_NEXT] = entry[_NEXT]
+        entry[_NEXT][_PREV] = entry[_PREV]
+
+    def _remove(self, entry):
+        self._unlink(entry)
+        cache_key = entry[_KEY]
+        del self._entries[cache_key]
+        slices = self._slices[cache_key[0]]
+        slices.discard(cache_key)
+        if not slices:
+            del self._slices[cache_key[0]]
+        self._bytes -= entry[_SIZE]
+
+    def _evict(self):
+        root = self._root
+        while self._entries and \
+                ((self.max_rows is not None and len(self._entries) > self.max_rows) or
+                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._remove(root[_PREV])
+
+class NegativeCache(RowCache):
+    """
+    A least recently used cache of the rows that were found to be missing.
+
+    The number of lookups that found a row to be missing is kept in
+    :attr:`hits`, and the number that did not in :attr:`misses`.
+
+    A cache should only be used by one column family.
+
+    """
+
+    def __init__(self, max_rows=100000, ttl=10):
+        """
+        :Parameters:
+            `max_rows`: int
+                The most missing rows to remember, counting each slice of a
+                row separately
+            `ttl`: float
+                The number of seconds to remember a missing row for, or None
+                to remember it until it is evicted or invalidated
+        """
+        RowCache.__init__(self, max_rows=max_rows, ttl=ttl)
+
+    def is_missing(self, key, predicate):
+        """
+        Returns whether `key` is known to be missing when read with
+        `predicate`.
+        """
+        return self.get(key, predicate) is not None
+
+    def add(self, key, predicate, generation=None):
+        """
+        Remembers that `key` is missing when read with `predicate`.
+        `generation` is used as in :meth:`RowCache.put()`.
+        """
+        self.put(key, predicate, True, generation)
@@ -0,0 +1,87 @@
+"""
+Vectorized decoding of fixed-width numeric column names and values.
+
+This backs :meth:`~pycassa.columnfamily.ColumnFamily.get_range_columnar()`
+and :meth:`~pycassa.columnfamily.ColumnFamily.multiget_columnar()`.  When
+`NumPy <http://numpy.scipy.org>`_ is installed, numeric columns are decoded
+into :class:`numpy.ndarray` objects; otherwise they are decoded into
+:class:`array.array` objects.
+
+"""
+
+import array
+import struct
+import sys
+
+try:
+    import numpy
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+__all__ = ['has_numpy', 'is_numeric', 'decode_array']
+
+# Width in bytes and NumPy dtype of each fixed-width numeric data type
+_WIDTHS = {
+    'LongType': 8,
+    'IntegerType': 4,
+}
+
+_DTYPES = {
+    'LongType': '>i8',
+    'IntegerType': '>i4',
+}
+
+_STRUCT_CODES = {
+    8: 'q',
+    4: 'i',
+}
+
+def _array_typecode(width):
+    for typecode in ('i', 'l'):
+        if array.array(typecode).itemsize == width:
+            return typecode
+    return None
+
+_TYPECODES = {}
+for _data_type, _width in _WIDTHS.iteritems():
+    _TYPECODES[_data_type] = _array_typecode(_width)
+
+def is_numeric(data_type):
+    """ Returns True if `data_type` can be decoded by :func:`decode_array()`. """
+    return data_type in _WIDTHS
+
+def decode_array(packed, data_type):
+    """
+    Decodes a list of packed values of a single numeric type at once.
+
+    :Parameters:
+        `packed`: [str]
+            The packed values, as returned by Cassandra
+        `data_type`: str
+            ``'LongType'`` or ``'IntegerType'``
+
+    :Returns:
+        a :class:`numpy.ndarray` in native byte order if NumPy is installed,
+        otherwise an :class:`array.array`
+
+    Raises :exc:`ValueError` if any value has the wrong width for `data_type`.
+    """
+    width = _WIDTHS[data_type]
+    if packed and set(map(len, packed)) != set([width]):
+        raise ValueError('values are not all %d bytes wide, as %s requires'
+                         % (width, data_type))
+    data = ''.join(packed)
+    if has_numpy:
+        dtype = numpy.dtype(_DTYPES[data_type])
+        return numpy.frombuffer(data, dtype=dtype).astype(dtype.newbyteorder('='))
+    typecode = _TYPECODES[data_type]
+    if typecode is None:
+        # No array typecode is wide enough on this platform
+        fmt = '>%d%s' % (len(packed), _STRUCT_CODES[width])
+        return list(struct.unpack(fmt, data))
+    values = array.array(typecode)
+    values.fromstring(data)
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values
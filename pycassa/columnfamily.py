@@ -8,15 +8,23 @@ manipulation of data inside Cassandra.
 from pycassa.cassandra.ttypes import Column, ColumnOrSuperColumn,\
     ColumnParent, ColumnPath, ConsistencyLevel, NotFoundException,\
     SlicePredicate, SliceRange, SuperColumn, KeyRange,\
-    IndexExpression, IndexClause
+    IndexExpression, IndexClause, TimedOutException, UnavailableException
 from pycassa.util import *
 
 import time
 import sys
 import uuid
 import struct
+from collections import deque
+from hashlib import md5
 
 from batch import CfMutator
+from wire import RowReader, RawRowReader
+from rows import LazyRow
+from columnar import is_numeric, decode_array
+from paging import AdaptivePageSize, estimate_size
+from workers import Future, CompletionQueue, SingleFlight, Batcher, \
+     shared_pool, prefetch as _prefetch
 
 __all__ = ['gm_timestamp', 'ColumnFamily']
 
@@ -27,6 +35,100 @@ _NON_SLICE = 0
 _SLICE_START = 1
 _SLICE_FINISH = 2
 
+_long_struct = struct.Struct('>q')
+_int_struct = struct.Struct('>i')
+
+def _identity(value):
+    return value
+
+def _pack_long(value):
+    return _long_struct.pack(long(value))  # q is 'long long'
+
+def _pack_int(value):
+    return _int_struct.pack(int(value))
+
+# Values of these types are sent as the bytes they hold, without a copy
+_BYTES_TYPES = (str, buffer, bytearray, memoryview)
+
+def _pack_ascii(value):
+    if isinstance(value, _BYTES_TYPES):
+        return value
+    raise TypeError("%r not valid for AsciiType" % (value,))
+
+def _pack_utf8(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    # Anything else should already be utf-8 encoded
+    if isinstance(value, _BYTES_TYPES):
+        return value
+    raise TypeError("%r not valid for UTF8Type" % (value,))
+
+def _make_uuid_packer(data_type):
+    def _pack_uuid(value):
+        if type(value) is str and len(value) == 16:
+            # Already packed, as by a TimeUUIDGenerator
+            return value
+        if not hasattr(value, 'bytes'):
+            raise TypeError("%s not valid for %s" % (value, data_type))
+        return value.bytes
+    return _pack_uuid
+
+def _unpack_long(b):
+    return _long_struct.unpack(b)[0]
+
+def _unpack_int(b):
+    return _int_struct.unpack(b)[0]
+
+def _unpack_utf8(b):
+    return b.decode('utf-8')
+
+def _unpack_uuid(b):
+    return uuid.UUID(bytes=b)
+
+# Encoders and decoders for each supported data type; anything missing
+# from these tables is treated as BytesType and passed through untouched.
+_PACKERS = {
+    'LongType': _pack_long,
+    'IntegerType': _pack_int,
+    'AsciiType': _pack_ascii,
+    'UTF8Type': _pack_utf8,
+    'LexicalUUIDType': _make_uuid_packer('LexicalUUIDType'),
+    'TimeUUIDType': _make_uuid_packer('TimeUUIDType'),
+}
+
+_UNPACKERS = {
+    'LongType': _unpack_long,
+    'IntegerType': _unpack_int,
+    'AsciiType': _identity,
+    'UTF8Type': _unpack_utf8,
+    'LexicalUUIDType': _unpack_uuid,
+    'TimeUUIDType': _unpack_uuid,
+}
+
+# The data types that pycassa.columnar can decode, by their unpacker
+_NUMERIC_TYPES = {
+    _unpack_long: 'LongType',
+    _unpack_int: 'IntegerType',
+}
+
+def _random_token(key):
+    # The absolute value of the MD5 digest read as a signed 128 bit integer
+    token = int(md5(key).hexdigest(), 16)
+    if token >= 2 ** 127:
+        token = 2 ** 128 - token
+    return str(token)
+
+def _byte_ordered_token(key):
+    return key.encode('hex')
+
+# How each partitioner maps a key to its token, which parallel scans use to
+# page through a token range
+_TOKEN_FUNCTIONS = {
+    'org.apache.cassandra.dht.RandomPartitioner': _random_token,
+    'org.apache.cassandra.dht.ByteOrderedPartitioner': _byte_ordered_token,
+    'org.apache.cassandra.dht.OrderPreservingPartitioner': _identity,
+}
+
 def gm_timestamp():
     """
     Gets the current GMT timestamp
@@ -53,7 +155,10 @@ class ColumnFamily(object):
                  write_consistency_level=ConsistencyLevel.ONE,
                  timestamp=gm_timestamp, super=False,
                  dict_class=dict, autopack_names=True,
-                 autopack_values=True):
+                 autopack_values=True, direct_reads=False,
+                 direct_writes=False, lazy_rows=False, column_codecs=None,
+                 row_cache=None, negative_cache=None, coalesce_reads=False,
+                 read_batch_window=None, read_batch_size=100, hedge=None):
         """
         Constructs an abstraction of a Cassandra column family or super column family.
 
@@ -99,6 +204,66 @@ class ColumnFamily(object):
                 the validator_class for a given column.  This should probably
                 be set to ``False`` when used with a
                 :class:`~pycassa.columnfamilymap.ColumnFamilyMap`.
+            `direct_reads`: bool
+                Whether rows should be built straight from the Thrift
+                response rather than from intermediate Thrift objects.
+                This requires a connection from :mod:`pycassa.connection`
+                or :mod:`pycassa.pool` and is only effective with a
+                framed transport.
+            `direct_writes`: bool
+                Whether inserts and removes should be serialized straight
+                into the ``batch_mutate`` wire format rather than built from
+                Thrift objects.  This also requires a connection from
+                :mod:`pycassa.connection` or :mod:`pycassa.pool`.  Values
+                given as a :class:`buffer`, :class:`bytearray` or
+                :class:`memoryview` are then sent without being copied.
+            `lazy_rows`: bool
+                Whether reads should return read-only
+                :class:`~pycassa.rows.LazyRow` mappings, which only unpack
+                the columns that are actually accessed, instead of
+                `dict_class` instances.  Rows are then always decoded
+                through Thrift objects, so `direct_reads` has no effect.
+            `column_codecs`: dict
+                Maps column names to :class:`~pycassa.types.Column`
+                instances, such as :class:`~pycassa.types.Compressed`, which
+                pack and unpack the values of those columns in place of
+                their validator_class.  These are applied even when
+                `autopack_values` is ``False``.
+            `row_cache`: :class:`~pycassa.cache.RowCache`
+                If set, rows read by :meth:`get()` and :meth:`multiget()`
+                are cached in it, and later reads of the same rows with the
+                same slice are served from it.  Rows written through this
+                column family or a :class:`~pycassa.batch.Mutator` are
+                dropped from it.
+            `negative_cache`: :class:`~pycassa.cache.NegativeCache`
+                If set, the rows that :meth:`get()` and :meth:`multiget()`
+                find to be missing are remembered in it, and later reads of
+                them with the same slice do not go to Cassandra.  Rows
+                written through this column family or a
+                :class:`~pycassa.batch.Mutator` are dropped from it.
+            `coalesce_reads`: bool
+                Whether identical :meth:`get()`, :meth:`multiget()` and
+                :meth:`get_count()` calls made from several threads at the
+                same time should share a single request, whose result or
+                exception is handed to every caller.  Callers that share a
+                request receive the same row objects, which must not be
+                modified.
+            `read_batch_window`: float
+                If set, :meth:`get()` calls made from several threads with
+                the same slice within this many seconds of each other are
+                fetched together with one ``multiget_slice`` request.  Each
+                batch waits this long for more calls to join it, which adds
+                that much latency to the calls.  Callers that get the same
+                key receive the same row object, which must not be modified.
+            `read_batch_size`: int
+                The most keys to fetch in a batch of :meth:`get()` calls; a
+                batch is fetched as soon as it is full
+            `hedge`: :class:`~pycassa.hedging.HedgePolicy`
+                If set, the requests made by :meth:`get()`,
+                :meth:`multiget()`, :meth:`get_range()`,
+                :meth:`get_indexed_slices()` and the methods built on them
+                are sent again on the policy's client when they are slow to
+                be answered, and the first answer is used
 
         """
 
@@ -112,6 +277,25 @@ class ColumnFamily(object):
         self.dict_class = dict_class
         self.autopack_names = autopack_names
         self.autopack_values = autopack_values
+        self.direct_reads = direct_reads
+        self.direct_writes = direct_writes
+        self.lazy_rows = lazy_rows
+        if column_codecs is None:
+            column_codecs = {}
+        self.column_codecs = column_codecs
+        self.row_cache = row_cache
+        self.negative_cache = negative_cache
+        self.coalesce_reads = coalesce_reads
+        self._single_flight = None
+        if coalesce_reads:
+            self._single_flight = SingleFlight()
+        self.read_batch_window = read_batch_window
+        self.read_batch_size = read_batch_size
+        self._read_batcher = None
+        if read_batch_window is not None:
+            self._read_batcher = Batcher(self._multiget_slice, read_batch_window,
+                                         read_batch_size)
+        self.hedge = hedge
 
         # Determine the ColumnFamily type to allow for auto conversion
         # so that packing/unpacking doesn't need to be done manually
@@ -140,6 +324,25 @@ class ColumnFamily(object):
                 for name, cdef in col_fam.column_metadata.items():
                     self.col_type_dict[name] = self._extract_type_name(cdef.validation_class)
 
+        # Resolve the encoder and decoder for every known data type once
+        # so that the read and write paths only do dict lookups
+        self._name_packer = _PACKERS.get(self.col_name_data_type, _identity)
+        self._name_unpacker = _UNPACKERS.get(self.col_name_data_type, _identity)
+        self._supercol_name_packer = _PACKERS.get(self.supercol_name_data_type, _identity)
+        self._supercol_name_unpacker = _UNPACKERS.get(self.supercol_name_data_type, _identity)
+        self._default_value_packer = _PACKERS.get(self.cf_data_type, _identity)
+        self._default_value_unpacker = _UNPACKERS.get(self.cf_data_type, _identity)
+        self._value_packers = dict()
+        self._value_unpackers = dict()
+        for name, d_type in self.col_type_dict.iteritems():
+            self._value_packers[name] = _PACKERS.get(d_type, _identity)
+            self._value_unpackers[name] = _UNPACKERS.get(d_type, _identity)
+        for name, codec in self.column_codecs.iteritems():
+            packed_name = self._pack_name(name)
+            self._value_packers[packed_name] = codec.pack
+            self._value_unpackers[packed_name] = codec.unpack
+        # Whether any column values need packing or unpacking at all
+        self._pack_values = self.autopack_values or bool(self.column_codecs)
 
     def _extract_type_name(self, string):
 
@@ -160,29 +363,149 @@ class ColumnFamily(object):
             return (value, column.timestamp)
         return value
 
-    def _convert_SuperColumn_to_base(self, super_column, include_timestamp):
+    def _convert_Columns_to_dict_class(self, columns, include_timestamp):
         ret = self.dict_class()
-        for column in super_column.columns:
-            ret[self._unpack_name(column.name)] = self._convert_Column_to_base(column, include_timestamp)
+        unpack_name = _identity
+        if self.autopack_names:
+            unpack_name = self._name_unpacker
+        if self._pack_values:
+            get_unpacker = self._value_unpackers.get
+            default_unpacker = self._default_value_unpacker
+            for column in columns:
+                value = get_unpacker(column.name, default_unpacker)(column.value)
+                if include_timestamp:
+                    value = (value, column.timestamp)
+                ret[unpack_name(column.name)] = value
+        elif include_timestamp:
+            for column in columns:
+                ret[unpack_name(column.name)] = (column.value, column.timestamp)
+        else:
+            for column in columns:
+                ret[unpack_name(column.name)] = column.value
         return ret
 
+    def _convert_SuperColumn_to_base(self, super_column, include_timestamp):
+        return self._convert_Columns_to_dict_class(super_column.columns, include_timestamp)
+
     def _convert_ColumnOrSuperColumns_to_dict_class(self, list_col_or_super, include_timestamp):
+        if not list_col_or_super or list_col_or_super[0].super_column is None:
+            return self._convert_Columns_to_dict_class(
+                    [col_or_super.column for col_or_super in list_col_or_super],
+                    include_timestamp)
         ret = self.dict_class()
+        unpack_name = _identity
+        if self.autopack_names:
+            unpack_name = self._supercol_name_unpacker
         for col_or_super in list_col_or_super:
-            if col_or_super.super_column is not None:
-                col = col_or_super.super_column
-                ret[self._unpack_name(col.name, is_supercol_name=True)] = self._convert_SuperColumn_to_base(col, include_timestamp)
-            else:
-                col = col_or_super.column
-                ret[self._unpack_name(col.name)] = self._convert_Column_to_base(col, include_timestamp)
+            col = col_or_super.super_column
+            ret[unpack_name(col.name)] = self._convert_Columns_to_dict_class(col.columns, include_timestamp)
         return ret
 
-    def _convert_KeySlice_list_to_dict_class(self, keyslice_list, include_timestamp):
-        ret = self.dict_class()
-        for keyslice in keyslice_list:
-            ret[keyslice.key] = self._convert_ColumnOrSuperColumns_to_dict_class(keyslice.columns, include_timestamp)
+    def _get_column_unpacker(self, include_timestamp):
+        """
+        Returns a callable that unpacks the value of a Thrift Column
+        the same way the value would appear in a dict_class row.
+        """
+        if self._pack_values:
+            get_unpacker = self._value_unpackers.get
+            default_unpacker = self._default_value_unpacker
+        else:
+            get_unpacker = None
+        def unpack_column(column):
+            value = column.value
+            if get_unpacker is not None:
+                value = get_unpacker(column.name, default_unpacker)(value)
+            if include_timestamp:
+                return (value, column.timestamp)
+            return value
+        return unpack_column
+
+    def _convert_ColumnOrSuperColumns_to_LazyRow(self, list_col_or_super, include_timestamp):
+        unpack_name = pack_name = _identity
+        unpack_supercol_name = pack_supercol_name = _identity
+        if self.autopack_names:
+            unpack_name = self._name_unpacker
+            pack_name = self._get_name_packer()
+            unpack_supercol_name = self._supercol_name_unpacker
+            pack_supercol_name = self._get_name_packer(is_supercol_name=True)
+        unpack_column = self._get_column_unpacker(include_timestamp)
+
+        if not list_col_or_super or list_col_or_super[0].super_column is None:
+            return LazyRow([col_or_super.column for col_or_super in list_col_or_super],
+                           unpack_name, pack_name, unpack_column)
+
+        def unpack_super_column(super_column):
+            return LazyRow(super_column.columns, unpack_name, pack_name,
+                           unpack_column)
+        return LazyRow([col_or_super.super_column for col_or_super in list_col_or_super],
+                       unpack_supercol_name, pack_supercol_name,
+                       unpack_super_column)
+
+    def _convert_ColumnOrSuperColumns_to_raw(self, list_col_or_super, include_timestamp):
+        if not list_col_or_super or list_col_or_super[0].super_column is None:
+            if include_timestamp:
+                return [(cosc.column.name, cosc.column.value, cosc.column.timestamp)
+                        for cosc in list_col_or_super]
+            return [(cosc.column.name, cosc.column.value)
+                    for cosc in list_col_or_super]
+        ret = []
+        for col_or_super in list_col_or_super:
+            col = col_or_super.super_column
+            if include_timestamp:
+                columns = [(c.name, c.value, c.timestamp) for c in col.columns]
+            else:
+                columns = [(c.name, c.value) for c in col.columns]
+            ret.append((col.name, columns))
         return ret
 
+    def _convert_row(self, list_col_or_super, include_timestamp, raw=False):
+        """Builds a row as a dict_class, a LazyRow or a raw list."""
+        if raw:
+            return self._convert_ColumnOrSuperColumns_to_raw(list_col_or_super, include_timestamp)
+        if self.lazy_rows:
+            return self._convert_ColumnOrSuperColumns_to_LazyRow(list_col_or_super, include_timestamp)
+        return self._convert_ColumnOrSuperColumns_to_dict_class(list_col_or_super, include_timestamp)
+
+    def _convert_rows_to_columnar(self, rows):
+        """
+        Turns ``(key, raw_columns)`` pairs into parallel sequences of keys,
+        column names and values, decoding numeric names and values in bulk.
+        """
+        keys = []
+        names = []
+        values = []
+        for key, columns in rows:
+            if not columns:
+                continue
+            row_names, row_values = zip(*columns)
+            keys.extend([key] * len(columns))
+            names.extend(row_names)
+            values.extend(row_values)
+
+        if self._pack_values:
+            get_unpacker = self._value_unpackers.get
+            default_unpacker = self._default_value_unpacker
+            unpacker = default_unpacker
+            if self._value_unpackers and names:
+                unpackers = set([get_unpacker(name, default_unpacker)
+                                 for name in set(names)])
+                unpacker = None
+                if len(unpackers) == 1:
+                    unpacker = unpackers.pop()
+            data_type = _NUMERIC_TYPES.get(unpacker)
+            if data_type is not None:
+                values = decode_array(values, data_type)
+            else:
+                values = [get_unpacker(name, default_unpacker)(value)
+                          for name, value in zip(names, values)]
+
+        if is_numeric(self.col_name_data_type):
+            names = decode_array(names, self.col_name_data_type)
+        elif self.autopack_names:
+            unpack_name = self._name_unpacker
+            names = [unpack_name(name) for name in names]
+        return keys, names, values
+
     def _rcl(self, alternative):
         """Helper function that returns self.read_consistency_level if
         alternative is None, otherwise returns alternative"""
@@ -218,95 +541,234 @@ class ColumnFamily(object):
 
         if is_supercol_name:
             d_type = self.supercol_name_data_type
+            packer = self._supercol_name_packer
         else:
             d_type = self.col_name_data_type
+            packer = self._name_packer
 
         if d_type == 'TimeUUIDType':
             if slice_end:
-                value = convert_time_to_uuid(value,
+                return convert_time_to_uuid_bytes(value,
                         lowest_val=(slice_end == _SLICE_START),
                         randomize=False)
             else:
-                value = convert_time_to_uuid(value,
+                return convert_time_to_uuid_bytes(value,
                         randomize=True)
 
-        return self._pack(value, d_type)
+        return packer(value)
 
-    def _unpack_name(self, b, is_supercol_name=False):
+    def _get_name_packer(self, is_supercol_name=False):
+        """
+        Returns a callable that packs a non-slice column or super column
+        name the same way :meth:`_pack_name` would.
+        """
         if not self.autopack_names:
-            return b
-        if b is None: return
-
+            return _identity
         if is_supercol_name:
             d_type = self.supercol_name_data_type
+            packer = self._supercol_name_packer
         else:
             d_type = self.col_name_data_type
+            packer = self._name_packer
+        if d_type == 'TimeUUIDType':
+            def _pack_timeuuid_name(value):
+                return convert_time_to_uuid_bytes(value, randomize=True)
+            return _pack_timeuuid_name
+        return packer
 
-        return self._unpack(b, d_type)
+    def _unpack_name(self, b, is_supercol_name=False):
+        if not self.autopack_names:
+            return b
+        if b is None: return
+
+        if is_supercol_name:
+            return self._supercol_name_unpacker(b)
+        return self._name_unpacker(b)
 
     def _get_data_type_for_col(self, col_name):
-        if col_name not in self.col_type_dict.keys(): 
-            return self.cf_data_type
-        return self.col_type_dict[col_name]
+        return self.col_type_dict.get(col_name, self.cf_data_type)
 
     def _pack_value(self, value, col_name):
-        if not self.autopack_values:
+        if not self._pack_values:
             return value
-        return self._pack(value, self._get_data_type_for_col(col_name))
+        return self._value_packers.get(col_name, self._default_value_packer)(value)
 
     def _unpack_value(self, value, col_name):
-        if not self.autopack_values:
+        if not self._pack_values:
             return value
-        return self._unpack(value, self._get_data_type_for_col(col_name))
+        return self._value_unpackers.get(col_name, self._default_value_unpacker)(value)
 
     def _pack(self, value, data_type):
         """
         Packs a value into the expected sequence of bytes that Cassandra expects.
         """
-        if data_type == 'LongType':
-            return struct.pack('>q', long(value))  # q is 'long long'
-        elif data_type == 'IntegerType':
-            return struct.pack('>i', int(value))
-        elif data_type == 'AsciiType':
-            return struct.pack(">%ds" % len(value), value)
-        elif data_type == 'UTF8Type':
-            try:
-                st = value.encode('utf-8')
-            except UnicodeDecodeError:
-                # value is already utf-8 encoded
-                st = value
-            return struct.pack(">%ds" % len(st), st)
-        elif data_type == 'TimeUUIDType' or data_type == 'LexicalUUIDType':
-            if not hasattr(value, 'bytes'):
-                raise TypeError("%s not valid for %s" % (value, data_type))
-            return struct.pack('>16s', value.bytes)
-        else:
-            return value
+        return _PACKERS.get(data_type, _identity)(value)
 
     def _unpack(self, b, data_type):
         """
         Unpacks Cassandra's byte-representation of values into their Python
         equivalents.
         """
+        return _UNPACKERS.get(data_type, _identity)(b)
 
-        if data_type == 'LongType':
-            return struct.unpack('>q', b)[0]
-        elif data_type == 'IntegerType':
-            return struct.unpack('>i', b)[0]
-        elif data_type == 'AsciiType':
-            return struct.unpack('>%ds' % len(b), b)[0]
-        elif data_type == 'UTF8Type':
-            unic = struct.unpack('>%ds' % len(b), b)[0]
-            return unic.decode('utf-8')
-        elif data_type == 'LexicalUUIDType' or data_type == 'TimeUUIDType':
-            temp_bytes = struct.unpack('>16s', b)[0]
-            return uuid.UUID(bytes=temp_bytes)
-        else: # BytesType
-            return b
+    def _get_row_reader(self, include_timestamp, raw=False):
+        """
+        Returns the :class:`~pycassa.wire.RowReader` to use for a direct
+        read, or None if rows should be built from Thrift objects.
+        """
+        if not self.direct_reads:
+            return None
+        if raw:
+            return RawRowReader(self, include_timestamp)
+        if self.lazy_rows:
+            return None
+        return RowReader(self, include_timestamp)
+
+    def _get_slice(self, key, column_parent, predicate, include_timestamp,
+                   read_consistency_level, raw=False, client=None):
+        """Fetches a single row, on `client` if it is given."""
+        if client is None:
+            if self.hedge is not None:
+                return self.hedge.call(self.client, self._get_slice, key,
+                                       column_parent, predicate,
+                                       include_timestamp,
+                                       read_consistency_level, raw)
+            client = self.client
+        reader = self._get_row_reader(include_timestamp, raw)
+        if reader is not None:
+            return client.get_slice_direct(key, column_parent, predicate,
+                                           read_consistency_level, reader)
+        list_col_or_super = client.get_slice(key, column_parent, predicate,
+                                             read_consistency_level)
+        return self._convert_row(list_col_or_super, include_timestamp, raw)
+
+    def _multiget_slice(self, keys, column_parent, predicate, include_timestamp,
+                        read_consistency_level, raw=False, client=None):
+        """
+        Fetches multiple rows, on `client` if it is given, and returns a
+        dict of ``{key: row}``.
+        """
+        if client is None:
+            if self.hedge is not None:
+                return self.hedge.call(self.client, self._multiget_slice, keys,
+                                       column_parent, predicate,
+                                       include_timestamp,
+                                       read_consistency_level, raw)
+            client = self.client
+        reader = self._get_row_reader(include_timestamp, raw)
+        if reader is not None:
+            return client.multiget_slice_direct(keys, column_parent, predicate,
+                                                read_consistency_level, reader)
+        keymap = client.multiget_slice(keys, column_parent, predicate,
+                                       read_consistency_level)
+        ret = {}
+        for key, columns in keymap.iteritems():
+            ret[key] = self._convert_row(columns, include_timestamp, raw)
+        return ret
+
+    def _multiget_slice_chunks(self, keys, column_parent, predicate,
+                               include_timestamp, read_consistency_level, raw,
+                               chunk_size, workers, max_in_flight, retries):
+        """
+        Fetches `keys` in chunks of `chunk_size` keys on worker threads,
+        yielding a ``(keys, {key: row})`` tuple for each chunk as it arrives.
+        No more than `max_in_flight` chunks, by default the number of
+        workers, are fetched or waiting to be yielded at once.
+        """
+        if workers is None:
+            workers = shared_pool()
+        if max_in_flight is None:
+            max_in_flight = workers.num_workers
+        keys = list(keys)
+        starts = iter(xrange(0, len(keys), chunk_size))
+        finished = CompletionQueue()
+        in_flight = {}
+        while True:
+            for start in starts:
+                chunk_keys = keys[start:start + chunk_size]
+                future = workers.submit(self._multiget_slice_retrying,
+                                        chunk_keys, column_parent, predicate,
+                                        include_timestamp,
+                                        read_consistency_level, raw, retries)
+                in_flight[future] = chunk_keys
+                finished.add(future)
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                return
+            future = finished.get()
+            chunk_keys = in_flight.pop(future)
+            yield chunk_keys, future.result()
+
+    def _multiget_slice_retrying(self, keys, column_parent, predicate,
+                                 include_timestamp, read_consistency_level, raw,
+                                 retries):
+        """Like :meth:`_multiget_slice()`, retrying on transient errors."""
+        attempt = 0
+        while True:
+            try:
+                return self._multiget_slice(keys, column_parent, predicate,
+                                            include_timestamp,
+                                            read_consistency_level, raw)
+            except (TimedOutException, UnavailableException):
+                if attempt >= retries:
+                    raise
+                attempt += 1
+
+    def _get_range_slices(self, column_parent, predicate, key_range,
+                          include_timestamp, read_consistency_level, raw=False,
+                          client=None):
+        """
+        Fetches a range of rows, on `client` if it is given, as a list of
+        ``(key, row)`` tuples.
+        """
+        if client is None:
+            if self.hedge is not None:
+                return self.hedge.call(self.client, self._get_range_slices,
+                                       column_parent, predicate, key_range,
+                                       include_timestamp,
+                                       read_consistency_level, raw)
+            client = self.client
+        reader = self._get_row_reader(include_timestamp, raw)
+        if reader is not None:
+            return client.get_range_slices_direct(column_parent, predicate,
+                    key_range, read_consistency_level, reader)
+        key_slices = client.get_range_slices(column_parent, predicate,
+                                             key_range, read_consistency_level)
+        # This may happen if nothing was ever inserted
+        if key_slices is None:
+            return []
+        return [(key_slice.key,
+                 self._convert_row(key_slice.columns, include_timestamp, raw))
+                for key_slice in key_slices]
+
+    def _get_indexed_slices(self, column_parent, index_clause, predicate,
+                            include_timestamp, read_consistency_level,
+                            client=None):
+        """
+        Fetches rows matching an index clause, on `client` if it is given,
+        as ``(key, row)`` tuples.
+        """
+        if client is None:
+            if self.hedge is not None:
+                return self.hedge.call(self.client, self._get_indexed_slices,
+                                       column_parent, index_clause, predicate,
+                                       include_timestamp,
+                                       read_consistency_level)
+            client = self.client
+        reader = self._get_row_reader(include_timestamp)
+        if reader is not None:
+            return client.get_indexed_slices_direct(column_parent,
+                    index_clause, predicate, read_consistency_level, reader)
+        keyslice_list = client.get_indexed_slices(column_parent, index_clause,
+                                                  predicate, read_consistency_level)
+        return [(key_slice.key,
+                 self._convert_row(key_slice.columns, include_timestamp))
+                for key_slice in keyslice_list]
 
     def get(self, key, columns=None, column_start="", column_finish="",
             column_reversed=False, column_count=100, include_timestamp=False,
-            super_column=None, read_consistency_level = None):
+            super_column=None, read_consistency_level = None, raw=False):
         """
         Fetch a key from a Cassandra server
 
@@ -331,36 +793,205 @@ class ColumnFamily(object):
             `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Affects the guaranteed replication factor before returning from
                 any read operation
+            `raw`: bool
+                If true, return the packed columns exactly as Cassandra
+                returned them and do not raise
+                :exc:`~pycassa.cassandra.ttypes.NotFoundException` for a
+                missing row
 
         :Returns:
             if include_timestamp == True: {'column': ('value', timestamp)}
             else: {'column': 'value'}
 
+            if raw == True: [('column', 'value')] or
+            [('column', 'value', timestamp)], with
+            [('super_column', [...])] for super columns
+
         """
 
-        super_column, column_start, column_finish = self._pack_slice_cols(
-                super_column, column_start, column_finish)
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
+
+        cache = self.row_cache
+        negative = self.negative_cache
+        if (cache is not None or negative is not None) and not raw:
+            predicate = self._cache_predicate(cp, sp, include_timestamp)
+            if cache is not None:
+                row = cache.get(key, predicate)
+                if row is not None:
+                    return row
+                generation = cache.generation()
+            if negative is not None:
+                if negative.is_missing(key, predicate):
+                    raise NotFoundException()
+                negative_generation = negative.generation()
+
+        rcl = self._rcl(read_consistency_level)
+        if self._read_batcher is not None:
+            group = (self._cache_predicate(cp, sp, include_timestamp), rcl, raw)
+            row = self._read_batcher.call(group, key, cp, sp, include_timestamp,
+                                          rcl, raw)
+            if row is None:
+                row = []
+        elif self._single_flight is not None:
+            request = ('get', key, self._cache_predicate(cp, sp, include_timestamp),
+                       rcl, raw)
+            row = self._single_flight.call(request, self._get_slice, key, cp, sp,
+                                           include_timestamp, rcl, raw)
+        else:
+            row = self._get_slice(key, cp, sp, include_timestamp, rcl, raw)
 
-        packed_cols = None
-        if columns is not None:
-            packed_cols = []
-            for col in columns:
-                packed_cols.append(self._pack_name(col, is_supercol_name=self.super))
+        if raw:
+            return row
+        if len(row) == 0:
+            if negative is not None:
+                negative.add(key, predicate, negative_generation)
+            raise NotFoundException()
+        if cache is not None:
+            cache.put(key, predicate, row, generation)
+        return row
+
+    def xget(self, key, column_start="", column_finish="", column_reversed=False,
+             column_count=None, include_timestamp=False, super_column=None,
+             read_consistency_level=None, buffer_size=None, prefetch=0,
+             workers=None, raw=False):
+        """
+        Get an iterator over the columns of a row, which are fetched
+        `buffer_size` at a time, so that rows of any width can be read
+        without holding the whole row in memory.
 
-        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
-        sp = create_SlicePredicate(packed_cols, column_start, column_finish,
-                                   column_reversed, column_count)
+        Columns are yielded as ``(name, value)`` tuples in the order of the
+        comparator, or in reverse order if `column_reversed` is set.  The
+        super columns of a super column family are yielded as ``(name,
+        {'subcolumn': 'value'})`` tuples, with subcolumns in a `dict_class`,
+        unless `super_column` is given.  Nothing is yielded for a row that
+        does not exist.
 
-        list_col_or_super = self.client.get_slice(key, cp, sp,
-                                                  self._rcl(read_consistency_level))
+        :Parameters:
+            `key`: str
+                The key of the row
+            `column_start`: str
+                Only fetch when a column or super_column is >= column_start,
+                or <= column_start if `column_reversed` is set
+            `column_finish`: str
+                Only fetch when a column or super_column is <= column_finish,
+                or >= column_finish if `column_reversed` is set
+            `column_reversed`: bool
+                Fetch the columns or super_columns in reverse order
+            `column_count`: int
+                Limit the number of columns or super_columns fetched in all
+            `include_timestamp`: bool
+                If true, yield a (value, timestamp) tuple for each column
+            `super_column`: str
+                Return columns only in this super_column
+            `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
+                Affects the guaranteed replication factor before returning from
+                any read operation
+            `buffer_size`: int
+                The number of columns or super_columns to fetch in each
+                request.  Defaults to this column family's `buffer_size`.
+            `prefetch`: int
+                The number of pages to fetch on a worker thread ahead of the
+                page being iterated over.  This requires a client that may be
+                used from several threads; see :mod:`pycassa.workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers used to prefetch pages.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+            `raw`: bool
+                If true, yield the packed columns exactly as Cassandra
+                returned them, in the format used by :meth:`get()`
 
-        if len(list_col_or_super) == 0:
-            raise NotFoundException()
-        return self._convert_ColumnOrSuperColumns_to_dict_class(list_col_or_super, include_timestamp)
+        :Returns:
+            iterator over ('column', 'value')
+        """
+
+        super_column, column_start, column_finish = self._pack_slice_cols(
+                super_column, column_start, column_finish)
+        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
+        if buffer_size is None:
+            buffer_size = self.buffer_size
+
+        pages = self._get_column_pages(key, cp, column_start, column_finish,
+                                       column_reversed, column_count,
+                                       include_timestamp,
+                                       self._rcl(read_consistency_level),
+                                       buffer_size)
+        if prefetch:
+            pages = _prefetch(pages, prefetch, workers)
+        if raw:
+            for page in pages:
+                for column in page:
+                    yield column
+            return
+
+        unpack_name = unpack_supercol_name = _identity
+        if self.autopack_names:
+            unpack_name = self._name_unpacker
+            unpack_supercol_name = self._supercol_name_unpacker
+        get_value_unpacker = None
+        if self._pack_values:
+            get_value_unpacker = self._value_unpackers.get
+            default_value_unpacker = self._default_value_unpacker
+        is_super = self.super and super_column is None
+
+        def unpack_column(column):
+            value = column[1]
+            if get_value_unpacker is not None:
+                value = get_value_unpacker(column[0], default_value_unpacker)(value)
+            if include_timestamp:
+                value = (value, column[2])
+            return unpack_name(column[0]), value
+
+        for page in pages:
+            for column in page:
+                if is_super:
+                    subcolumns = self.dict_class()
+                    for subcolumn in column[1]:
+                        name, value = unpack_column(subcolumn)
+                        subcolumns[name] = value
+                    yield unpack_supercol_name(column[0]), subcolumns
+                else:
+                    yield unpack_column(column)
+
+    def _get_column_pages(self, key, column_parent, column_start, column_finish,
+                          column_reversed, column_count, include_timestamp,
+                          read_consistency_level, buffer_size):
+        """
+        Fetches the packed columns of a row a page at a time, yielding each
+        page as a list in the format of a `raw` row.
+        """
+        fetched = 0
+        first = True
+        while True:
+            # Every page after the first asks for one more column, since it
+            # starts with the last column of the page before it
+            count = buffer_size
+            if not first:
+                count += 1
+            if column_count is not None:
+                count = min(count, column_count - fetched + (not first))
+            predicate = create_SlicePredicate(None, column_start, column_finish,
+                                              column_reversed, count)
+            columns = self._get_slice(key, column_parent, predicate,
+                                      include_timestamp, read_consistency_level,
+                                      raw=True)
+            page = columns
+            # The column may have been removed since the last page was read
+            if not first and columns and columns[0][0] == column_start:
+                page = columns[1:]
+            fetched += len(page)
+            if page:
+                yield page
+            if len(columns) < count or (column_count is not None and
+                                        fetched >= column_count):
+                return
+            column_start = columns[-1][0]
+            first = False
 
     def get_indexed_slices(self, index_clause, columns=None, column_start="", column_finish="",
                           column_reversed=False, column_count=100, include_timestamp=False,
-                          super_column=None, read_consistency_level=None):
+                          super_column=None, read_consistency_level=None,
+                          page_size=None):
         """
         Fetches a list of KeySlices from a Cassandra server based on an index clause
 
@@ -389,42 +1020,109 @@ class ColumnFamily(object):
             `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Affects the guaranteed replication factor before returning from
                 any read operation
+            `page_size`: int or :class:`~pycassa.paging.AdaptivePageSize`
+                If set, the matching rows, up to the `count` of
+                `index_clause`, are fetched in pages of this many rows, or of
+                as many rows as the object chooses for each page, rather
+                than in a single request.
 
         :Returns:
             if include_timestamp == True: {key : {column : (value, timestamp)}}
             else: {key : {column : value}}
         """
 
-        (super_column, column_start, column_finish) = self._pack_slice_cols(
-                super_column, column_start, column_finish)
-
-        packed_cols = None
-        if columns is not None:
-            packed_cols = []
-            for col in columns:
-                packed_cols.append(self._pack_name(col, is_supercol_name=self.super))
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
 
-        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
-        sp = create_SlicePredicate(packed_cols, column_start, column_finish,
-                                   column_reversed, column_count)
+        index_clause = self._pack_index_clause(index_clause)
 
-        # Pack the values in the index clause expressions
-        new_exprs = []
-        for expr in index_clause.expressions:
-            new_exprs.append(IndexExpression(self._pack_name(expr.column_name), expr.op, \
-                            self._pack_value(expr.value, expr.column_name)))
-        index_clause.expressions = new_exprs
-
-        keyslice_list = self.client.get_indexed_slices(cp, index_clause, sp,
+        if page_size is None:
+            key_slices = self._get_indexed_slices(cp, index_clause, sp, include_timestamp,
                                                   self._rcl(read_consistency_level))
+        else:
+            key_slices = []
+            for page in self._get_indexed_pages(cp, index_clause, sp, include_timestamp,
+                                                self._rcl(read_consistency_level),
+                                                page_size, index_clause.count):
+                key_slices.extend(page)
 
-        if len(keyslice_list) == 0:
+        if len(key_slices) == 0:
             raise NotFoundException()
-        return self._convert_KeySlice_list_to_dict_class(keyslice_list, include_timestamp)
+        ret = self.dict_class()
+        for key, row in key_slices:
+            ret[key] = row
+        return ret
+
+    def get_indexed_slices_iter(self, index_clause, columns=None, column_start="",
+                                column_finish="", column_reversed=False,
+                                column_count=100, include_timestamp=False,
+                                super_column=None, read_consistency_level=None,
+                                page_size=None, row_count=None, max_bytes=None,
+                                prefetch=0, workers=None):
+        """
+        Get an iterator over every row matching an index clause, which are
+        fetched a page at a time starting from the `start_key` of
+        `index_clause`.  The `count` of `index_clause` is ignored; use
+        `row_count` to limit the number of rows.  Nothing is yielded if no
+        rows match.
+
+        The parameters are the same as those of :meth:`get_indexed_slices()`,
+        and:
+
+        :Parameters:
+            `page_size`: int or :class:`~pycassa.paging.AdaptivePageSize`
+                The number of rows to fetch in each request, or an object
+                that chooses it for each page.  Defaults to `buffer_size`.
+            `row_count`: int
+                Stop after this many rows
+            `max_bytes`: int
+                Stop before the rows yielded would add up to more than this
+                many bytes, as estimated by
+                :func:`~pycassa.paging.estimate_size()`
+            `prefetch`: int
+                The number of pages to fetch on a worker thread ahead of the
+                page being iterated over.  This requires a client that may be
+                used from several threads; see :mod:`pycassa.workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers used to prefetch pages.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+
+        :Returns:
+            iterator over ('key', {'column': 'value'})
+        """
+
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
+        pages = self._get_indexed_pages(cp, self._pack_index_clause(index_clause),
+                                        sp, include_timestamp,
+                                        self._rcl(read_consistency_level),
+                                        page_size, row_count)
+        if prefetch:
+            pages = _prefetch(pages, prefetch, workers)
+
+        total = 0
+        for page in pages:
+            for key, row in page:
+                if max_bytes is not None:
+                    total += len(key) + estimate_size(row)
+                    if total > max_bytes:
+                        return
+                yield key, row
+
+    def _pack_index_clause(self, index_clause):
+        """Returns a copy of `index_clause` with its expressions packed."""
+        new_exprs = []
+        for expr in index_clause.expressions:
+            name = self._pack_name(expr.column_name)
+            new_exprs.append(IndexExpression(name, expr.op,
+                                             self._pack_value(expr.value, name)))
+        return IndexClause(expressions=new_exprs, start_key=index_clause.start_key,
+                           count=index_clause.count)
 
     def multiget(self, keys, columns=None, column_start="", column_finish="",
                  column_reversed=False, column_count=100, include_timestamp=False,
-                 super_column=None, read_consistency_level = None):
+                 super_column=None, read_consistency_level = None, raw=False,
+                 chunk_size=None, workers=None, chunk_retries=1):
         """
         Fetch multiple keys from a Cassandra server
 
@@ -449,54 +1147,185 @@ class ColumnFamily(object):
             `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Affects the guaranteed replication factor before returning from
                 any read operation
+            `raw`: bool
+                If true, return the packed columns of each row exactly as
+                Cassandra returned them, in the format used by :meth:`get()`
+            `chunk_size`: int
+                If set, the keys are fetched in chunks of this many keys,
+                each with its own ``multiget_slice`` call, and the chunks
+                are fetched at the same time on worker threads.  This
+                requires a client that may be used from several threads;
+                see :mod:`pycassa.workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers that fetch chunks.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+            `chunk_retries`: int
+                The number of times to retry a chunk which fails with a
+                :exc:`~pycassa.cassandra.ttypes.TimedOutException` or an
+                :exc:`~pycassa.cassandra.ttypes.UnavailableException`
+                before giving up on the whole call
 
         :Returns:
             if include_timestamp == True: {'key': {'column': ('value', timestamp)}}
             else: {'key': {'column': 'value'}}
-        """
 
-        (super_column, column_start, column_finish) = self._pack_slice_cols(
-                super_column, column_start, column_finish)
+            if raw == True: {'key': [('column', 'value')]}, in no particular
+            order and including every requested key
+        """
 
-        packed_cols = None
-        if columns is not None:
-            packed_cols = []
-            for col in columns:
-                packed_cols.append(self._pack_name(col, is_supercol_name=self.super))
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
 
-        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
-        sp = create_SlicePredicate(packed_cols, column_start, column_finish,
-                                   column_reversed, column_count)
-
-        keymap = self.client.multiget_slice(keys, cp, sp,
-                                            self._rcl(read_consistency_level))
-        
+        # A key that is asked for more than once is only looked up and
+        # fetched once
+        fetch_keys = []
+        seen = set()
+        for key in keys:
+            if key not in seen:
+                seen.add(key)
+                fetch_keys.append(key)
+
+        # Only the keys that are not cached or known to be missing are fetched
+        cache = self.row_cache
+        negative = self.negative_cache
+        cached = None
+        if (cache is not None or negative is not None) and not raw:
+            predicate = self._cache_predicate(cp, sp, include_timestamp)
+            cached = {}
+            unique_keys = fetch_keys
+            fetch_keys = []
+            for key in unique_keys:
+                if cache is not None:
+                    row = cache.get(key, predicate)
+                    if row is not None:
+                        cached[key] = row
+                        continue
+                if negative is None or not negative.is_missing(key, predicate):
+                    fetch_keys.append(key)
+            if cache is not None:
+                generation = cache.generation()
+            if negative is not None:
+                negative_generation = negative.generation()
+
+        rcl = self._rcl(read_consistency_level)
+        if not fetch_keys:
+            keymap = {}
+        elif self._single_flight is None:
+            keymap = self._multiget_keymap(fetch_keys, cp, sp, include_timestamp,
+                                           rcl, raw, chunk_size, workers,
+                                           chunk_retries)
+        else:
+            request = ('multiget', tuple(fetch_keys),
+                       self._cache_predicate(cp, sp, include_timestamp), rcl, raw)
+            keymap = self._single_flight.call(request, self._multiget_keymap,
+                                              fetch_keys, cp, sp, include_timestamp,
+                                              rcl, raw, chunk_size, workers,
+                                              chunk_retries)
+            if raw:
+                # Each caller gets its own dict, though the rows are shared
+                keymap = dict(keymap)
+        if raw:
+            return keymap
+
+        if cached is not None:
+            for key in fetch_keys:
+                columns = keymap.get(key)
+                if columns is not None and len(columns) > 0:
+                    if cache is not None:
+                        cache.put(key, predicate, columns, generation)
+                elif negative is not None:
+                    negative.add(key, predicate, negative_generation)
+            cached.update(keymap)
+            keymap = cached
+
+        # Keep the order of keys, leaving out empty rows
         ret = self.dict_class()
-        
-        # Keep the order of keys
         for key in keys:
-            ret[key] = None
+            columns = keymap.get(key)
+            if columns is not None and len(columns) > 0:
+                ret[key] = columns
+        return ret
 
-        non_empty_keys = []
-        for key, columns in keymap.iteritems():
-            if len(columns) > 0:
-                non_empty_keys.append(key)
-                ret[key] = self._convert_ColumnOrSuperColumns_to_dict_class(columns, include_timestamp) 
+    def _multiget_keymap(self, keys, column_parent, predicate, include_timestamp,
+                         read_consistency_level, raw, chunk_size, workers,
+                         chunk_retries):
+        """
+        Fetches multiple rows, in chunks if there are more than `chunk_size`
+        keys, and returns a dict of ``{key: row}``.
+        """
+        if chunk_size is None or len(keys) <= chunk_size:
+            return self._multiget_slice(keys, column_parent, predicate,
+                                        include_timestamp, read_consistency_level,
+                                        raw)
+        keymap = {}
+        for chunk_keys, chunk in self._multiget_slice_chunks(
+                keys, column_parent, predicate, include_timestamp,
+                read_consistency_level, raw, chunk_size, workers, None,
+                chunk_retries):
+            keymap.update(chunk)
+        return keymap
+
+    def multiget_iter(self, keys, columns=None, column_start="", column_finish="",
+                      column_reversed=False, column_count=100,
+                      include_timestamp=False, super_column=None,
+                      read_consistency_level=None, raw=False, chunk_size=None,
+                      max_in_flight=None, workers=None, chunk_retries=1):
+        """
+        Get an iterator over multiple rows which fetches the keys in chunks
+        on worker threads and yields the rows of each chunk as soon as it
+        arrives, so that the rows can be processed before every chunk has
+        been fetched.  At most `max_in_flight` chunks are fetched or
+        waiting to be iterated over at once, which bounds the memory used.
 
-        for key in keys:
-            if key not in non_empty_keys:
-                del ret[key]
+        Chunks are yielded in the order that they arrive, and the rows of a
+        chunk in the order of their keys.  Like :meth:`multiget()`, empty
+        rows are left out unless `raw` is set.  This requires a client that
+        may be used from several threads; see :mod:`pycassa.workers`.
 
-        return ret
+        The parameters are the same as those of :meth:`multiget()`, and:
+
+        :Parameters:
+            `chunk_size`: int
+                The number of keys to fetch in each ``multiget_slice`` call.
+                Defaults to this column family's `buffer_size`.
+            `max_in_flight`: int
+                The most chunks to hold at once.  Defaults to the number of
+                threads in `workers`.
+
+        :Returns:
+            iterator over ('key', {'column': 'value'})
+        """
+
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
+        if chunk_size is None:
+            chunk_size = self.buffer_size
+
+        for chunk_keys, keymap in self._multiget_slice_chunks(
+                keys, cp, sp, include_timestamp, self._rcl(read_consistency_level),
+                raw, chunk_size, workers, max_in_flight, chunk_retries):
+            for key in chunk_keys:
+                columns = keymap.get(key)
+                if columns is not None and (raw or len(columns) > 0):
+                    yield key, columns
 
     MAX_COUNT = 2**31-1
     def get_count(self, key, super_column=None,
                   read_consistency_level=None,
                   columns=None, column_start="",
-                  column_finish=""):
+                  column_finish="", page_size=None, splits=None,
+                  max_in_flight=None, workers=None, callback=None):
         """
         Count the number of columns for a key
 
+        By default, the columns are counted with one ``get_count`` request,
+        which makes Cassandra read the whole row at once and may time out
+        for very wide rows.  If `page_size` or `splits` is set, the columns
+        are instead fetched and counted `page_size` at a time, and the
+        column ranges between `splits` are counted at the same time on
+        worker threads, which requires a client that may be used from
+        several threads; see :mod:`pycassa.workers`.
+
         :Parameters:
             `key`: str
                 The key to count columns for
@@ -511,35 +1340,72 @@ class ColumnFamily(object):
             `read_consistency_level` : :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Affects the guaranteed replication factor before returning from
                 any read operation
+            `page_size`: int
+                The number of columns to fetch at a time.  Defaults to this
+                column family's `buffer_size` if `splits` is set.
+            `splits`: [str]
+                Column names, in comparator order and between
+                `column_start` and `column_finish`, which cut the row into
+                ranges that are counted at the same time, such as the first
+                TimeUUID of each day
+            `max_in_flight`: int
+                The most pages to fetch at once.  Defaults to the number of
+                threads in `workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers that fetch pages of split rows.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+            `callback`: function
+                If set, ``callback(count)`` is called with the number of
+                columns counted so far after each page
 
         :Returns:
             int Count of columns
         """
 
-        (super_column, column_start, column_finish) = self._pack_slice_cols(
-                super_column, column_start, column_finish)
-
-        packed_cols = None
-        if columns is not None:
-            packed_cols = []
-            for col in columns:
-                packed_cols.append(self._pack_name(col, is_supercol_name=self.super))
-
-        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
-        sp = create_SlicePredicate(packed_cols, column_start, column_finish,
-                                   False, self.MAX_COUNT)
-
-
-        return self.client.get_count(key, cp, sp,
-                                     self._rcl(read_consistency_level))
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       False, self.MAX_COUNT, super_column)
+        rcl = self._rcl(read_consistency_level)
+        if columns is None and (page_size is not None or splits is not None):
+            if page_size is None:
+                page_size = self.buffer_size
+            bounds = [sp.slice_range.start]
+            for split in splits or ():
+                bounds.append(self._pack_name(split, is_supercol_name=self.super,
+                                              slice_end=_SLICE_START))
+            bounds.append(sp.slice_range.finish)
+            ranges = []
+            for i in xrange(len(bounds) - 1):
+                ranges.append((key, cp, bounds[i], bounds[i + 1],
+                               i == len(bounds) - 2))
+            progress = None
+            if callback is not None:
+                def progress(counts, key):
+                    callback(counts[key])
+            return self._count_ranges(ranges, rcl, page_size, max_in_flight,
+                                      workers, progress)[key]
+
+        if self._single_flight is None:
+            return self.client.get_count(key, cp, sp, rcl)
+        request = ('get_count', key, self._cache_predicate(cp, sp, False), rcl)
+        return self._single_flight.call(request, self.client.get_count,
+                                        key, cp, sp, rcl)
 
     def multiget_count(self, keys, super_column=None,
                        read_consistency_level=None,
                        columns=None, column_start="",
-                       column_finish="", ):
+                       column_finish="", chunk_size=None, page_size=None,
+                       max_in_flight=None, workers=None, callback=None):
         """
         Perform a get_count in parallel on a list of keys.
 
+        If `chunk_size` is set, the keys are counted in chunks, each with
+        its own ``multiget_count`` call, at the same time on worker
+        threads.  If `page_size` is set, no more than `page_size` columns
+        are counted per row in those calls, and the rows that have that
+        many are then counted a page at a time as by :meth:`get_count()`,
+        several rows at once.  Either requires a client that may be used
+        from several threads; see :mod:`pycassa.workers`.
+
         :Parameters:
             `keys` : [str]
                 The keys to count columns for
@@ -554,32 +1420,182 @@ class ColumnFamily(object):
             `read_consistency_level` : :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Affects the guaranteed replication factor before returning from
                 any read operation
+            `chunk_size`: int
+                The number of keys to count in each ``multiget_count`` call
+            `page_size`: int
+                The number of columns to fetch at a time from wide rows
+            `max_in_flight`: int
+                The most chunks or pages to fetch at once.  Defaults to the
+                number of threads in `workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers that fetch chunks and pages.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+            `callback`: function
+                If set, ``callback(key, count)`` is called on the calling
+                thread as the count of each key becomes known
 
         :Returns:
             {'keyname': int count}
         """
 
-        (super_column, column_start, column_finish) = self._pack_slice_cols(
-                super_column, column_start, column_finish)
-
-        packed_cols = None
         if columns is not None:
-            packed_cols = []
-            for col in columns:
-                packed_cols.append(self._pack_name(col, is_supercol_name=self.super))
-
-        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
-        sp = create_SlicePredicate(packed_cols, column_start, column_finish,
-                                   False, self.MAX_COUNT)
+            page_size = None
+        count = self.MAX_COUNT
+        if page_size is not None:
+            count = page_size
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       False, count, super_column)
+        rcl = self._rcl(read_consistency_level)
+        if chunk_size is None and page_size is None and callback is None:
+            return self.client.multiget_count(keys, cp, sp, rcl)
+
+        counts = {}
+        wide = []
+        for chunk in self._multiget_count_chunks(keys, cp, sp, rcl, chunk_size,
+                                                 max_in_flight, workers):
+            for key, key_count in chunk.iteritems():
+                if page_size is not None and key_count >= page_size:
+                    wide.append((key, cp, sp.slice_range.start,
+                                 sp.slice_range.finish, True))
+                    continue
+                counts[key] = key_count
+                if callback is not None:
+                    callback(key, key_count)
+
+        if wide:
+            counts.update(self._count_ranges(wide, rcl, page_size, max_in_flight,
+                                             workers, finished_key=callback))
+        return counts
+
+    def _multiget_count_chunks(self, keys, column_parent, predicate,
+                               read_consistency_level, chunk_size,
+                               max_in_flight, workers):
+        """
+        Counts `keys` in chunks of `chunk_size` keys on worker threads, or
+        all at once on the calling thread if `chunk_size` is None, yielding
+        a dict of ``{key: count}`` for each chunk as it arrives.
+        """
+        if chunk_size is None:
+            yield self.client.multiget_count(keys, column_parent, predicate,
+                                             read_consistency_level)
+            return
+        if workers is None:
+            workers = shared_pool()
+        if max_in_flight is None:
+            max_in_flight = workers.num_workers
+        keys = list(keys)
+        starts = iter(xrange(0, len(keys), chunk_size))
+        finished = CompletionQueue()
+        in_flight = 0
+        while True:
+            for start in starts:
+                future = workers.submit(self.client.multiget_count,
+                                        keys[start:start + chunk_size],
+                                        column_parent, predicate,
+                                        read_consistency_level)
+                finished.add(future)
+                in_flight += 1
+                if in_flight >= max_in_flight:
+                    break
+            if not in_flight:
+                return
+            in_flight -= 1
+            yield finished.get().result()
 
-        return self.client.multiget_count(keys, cp, sp,
-                                     self._rcl(read_consistency_level))
+    def _count_ranges(self, ranges, read_consistency_level, page_size,
+                      max_in_flight, workers, progress=None, finished_key=None):
+        """
+        Counts the columns in each ``(key, column_parent, start, finish,
+        final)`` range by fetching them `page_size` at a time, and returns
+        a dict of ``{key: count}`` with the totals of every range of a key.
+        A column named `finish` is only counted in the `final` range of a
+        key, so that ranges may share their bounds.
+
+        A single range is counted on the calling thread; several are
+        counted at the same time on `workers`.  After each page,
+        ``progress(counts, key)`` is called, and once every range of a key
+        has been counted, ``finished_key(key, count)``.
+        """
+        counts = {}
+        remaining = {}
+        for key, column_parent, start, finish, final in ranges:
+            counts[key] = 0
+            remaining[key] = remaining.get(key, 0) + 1
+
+        if len(ranges) > 1:
+            if workers is None:
+                workers = shared_pool()
+            if max_in_flight is None:
+                max_in_flight = workers.num_workers
+            submit = workers.submit
+        else:
+            max_in_flight = 1
+            def submit(func, *args):
+                future = Future()
+                try:
+                    future._set_result(func(*args))
+                except:
+                    future._set_exc_info(sys.exc_info())
+                return future
+
+        # Each entry is a range, with the start of its next page and the
+        # number of columns at the start of that page that were already
+        # counted, which is one for every page after the first
+        pending = deque([(column_range, column_range[2], 0)
+                         for column_range in ranges])
+        finished = CompletionQueue()
+        in_flight = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < max_in_flight:
+                entry = pending.popleft()
+                (key, column_parent, start, finish, final), page_start, skip = entry
+                future = submit(self._count_slice, key, column_parent, page_start,
+                                finish, page_size + skip, read_consistency_level)
+                in_flight[future] = entry
+                finished.add(future)
+
+            future = finished.get()
+            entry = in_flight.pop(future)
+            column_range, page_start, skip = entry
+            key, column_parent, start, finish, final = column_range
+            count, first_name, last_name = future.result()
+            counted = count
+            # The column the page starts from may have been removed since
+            if skip and count and first_name == page_start:
+                counted -= 1
+            if not final and counted and last_name == finish:
+                counted -= 1
+            counts[key] += counted
+            if progress is not None:
+                progress(counts, key)
+            if count == page_size + skip and last_name != finish:
+                # Ranges that are under way are finished before others start
+                pending.appendleft((column_range, last_name, 1))
+                continue
+            remaining[key] -= 1
+            if not remaining[key] and finished_key is not None:
+                finished_key(key, counts[key])
+        return counts
+
+    def _count_slice(self, key, column_parent, start, finish, count,
+                     read_consistency_level):
+        """
+        Fetches up to `count` columns of a row from `start` to `finish` and
+        returns a ``(count, first_name, last_name)`` tuple describing them.
+        """
+        predicate = create_SlicePredicate(None, start, finish, False, count)
+        columns = self._get_slice(key, column_parent, predicate, False,
+                                  read_consistency_level, raw=True)
+        if not columns:
+            return 0, None, None
+        return len(columns), columns[0][0], columns[-1][0]
 
 
     def get_range(self, start="", finish="", columns=None, column_start="",
                   column_finish="", column_reversed=False, column_count=100,
                   row_count=None, include_timestamp=False,
-                  super_column=None, read_consistency_level = None):
+                  super_column=None, read_consistency_level = None, raw=False,
+                  prefetch=0, workers=None, page_size=None):
         """
         Get an iterator over keys in a specified range
 
@@ -608,11 +1624,337 @@ class ColumnFamily(object):
             `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Affects the guaranteed replication factor before returning from
                 any read operation
+            `raw`: bool
+                If true, yield the packed columns of each row exactly as
+                Cassandra returned them, in the format used by :meth:`get()`
+            `prefetch`: int
+                The number of pages of `buffer_size` rows to fetch on a
+                worker thread ahead of the page being iterated over, which
+                also caps how many pages are held in memory at once.  This
+                requires a client that may be used from several threads;
+                see :mod:`pycassa.workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers used to prefetch pages.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+            `page_size`: int or :class:`~pycassa.paging.AdaptivePageSize`
+                The number of rows to fetch in each request, or an object
+                that chooses it for each page.  Defaults to `buffer_size`.
 
         :Returns:
             iterator over ('key', {'column': 'value'})
         """
 
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
+
+        pages = self._get_range_pages(cp, sp, start, finish, row_count,
+                                      include_timestamp,
+                                      self._rcl(read_consistency_level), raw,
+                                      page_size)
+        if prefetch:
+            pages = _prefetch(pages, prefetch, workers)
+        for page in pages:
+            for key_slice in page:
+                yield key_slice
+
+    def get_range_parallel(self, columns=None, column_start="", column_finish="",
+                           column_reversed=False, column_count=100,
+                           include_timestamp=False, super_column=None,
+                           read_consistency_level=None, keys_per_split=None,
+                           max_in_flight=None, workers=None, raw=False):
+        """
+        Get an iterator over every row of the column family, scanning
+        several token ranges at once.
+
+        The ring is cut into the token ranges reported by ``describe_ring``,
+        and each of those is cut further with ``describe_splits`` if
+        `keys_per_split` is set.  The ranges are paged through `buffer_size`
+        rows at a time on worker threads, so this requires a client that may
+        be used from several threads, such as the one returned by
+        :meth:`~pycassa.connection.connect()`; see :mod:`pycassa.workers`.
+
+        Rows are yielded as their pages arrive, so they are not in key or
+        token order.  Paging through a range requires computing the tokens
+        of keys, which is only done for the ``RandomPartitioner``,
+        ``ByteOrderedPartitioner`` and ``OrderPreservingPartitioner``; with
+        other partitioners the rows are fetched one page at a time, as by
+        :meth:`get_range()`.
+
+        :Parameters:
+            `columns`: [str]
+                Limit the columns or super_columns fetched to the specified list
+            `column_start`: str
+                Only fetch when a column or super_column is >= column_start
+            `column_finish`: str
+                Only fetch when a column or super_column is <= column_finish
+            `column_reversed`: bool
+                Fetch the columns or super_columns in reverse order. This will do
+                nothing unless you passed a dict_class to the constructor.
+            `column_count`: int
+                Limit the number of columns or super_columns fetched per key
+            `include_timestamp`: bool
+                If true, return a (value, timestamp) tuple for each column
+            `super_column`: string
+                Return columns only in this super_column
+            `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
+                Affects the guaranteed replication factor before returning from
+                any read operation
+            `keys_per_split`: int
+                The approximate number of keys in each range that is scanned
+                on its own.  By default, each range owned by a node is
+                scanned as a whole.
+            `max_in_flight`: int
+                The most pages to fetch at once.  Defaults to the number of
+                threads in `workers`.
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers that fetch pages.  Defaults to
+                :meth:`~pycassa.workers.shared_pool()`.
+            `raw`: bool
+                If true, yield the packed columns of each row exactly as
+                Cassandra returned them, in the format used by :meth:`get()`
+
+        :Returns:
+            iterator over ('key', {'column': 'value'})
+        """
+
+        cp, sp = self._slice_predicate(columns, column_start, column_finish,
+                                       column_reversed, column_count, super_column)
+        read_consistency_level = self._rcl(read_consistency_level)
+
+        get_token = _TOKEN_FUNCTIONS.get(self.client.describe_partitioner())
+        if get_token is None:
+            for page in self._get_range_pages(cp, sp, '', '', None,
+                                              include_timestamp,
+                                              read_consistency_level, raw):
+                for key_slice in page:
+                    yield key_slice
+            return
+
+        if workers is None:
+            workers = shared_pool()
+        if max_in_flight is None:
+            max_in_flight = workers.num_workers
+
+        ranges = deque(self._get_token_ranges(keys_per_split))
+        finished = CompletionQueue()
+        in_flight = {}
+        while ranges or in_flight:
+            while ranges and len(in_flight) < max_in_flight:
+                start_token, end_token = ranges.popleft()
+                key_range = KeyRange(start_token=start_token, end_token=end_token,
+                                     count=self.buffer_size)
+                future = workers.submit(self._get_range_slices, cp, sp, key_range,
+                                        include_timestamp, read_consistency_level,
+                                        raw)
+                in_flight[future] = end_token
+                finished.add(future)
+
+            future = finished.get()
+            end_token = in_flight.pop(future)
+            page = future.result()
+            if len(page) == self.buffer_size:
+                # Token ranges exclude their start, so the next page of this
+                # range starts just past the last key of this one.  A range
+                # from a token to itself is the whole ring, so stop at the end.
+                next_token = get_token(page[-1][0])
+                if next_token != end_token:
+                    # Finish ranges that are under way before starting others
+                    ranges.appendleft((next_token, end_token))
+            for key_slice in page:
+                yield key_slice
+
+    def _get_token_ranges(self, keys_per_split):
+        """Returns ``(start_token, end_token)`` tuples covering the ring."""
+        ranges = []
+        for token_range in self.client.describe_ring(self.client.keyspace):
+            start_token = token_range.start_token
+            end_token = token_range.end_token
+            tokens = None
+            if keys_per_split is not None:
+                tokens = self.client.describe_splits(self.column_family, start_token,
+                                                     end_token, keys_per_split)
+            if not tokens or len(tokens) < 2:
+                tokens = [start_token, end_token]
+            for i in xrange(len(tokens) - 1):
+                ranges.append((tokens[i], tokens[i + 1]))
+        return ranges
+
+    def _get_range_pages(self, column_parent, predicate, start, finish, row_count,
+                         include_timestamp, read_consistency_level, raw=False,
+                         page_size=None):
+        """
+        Fetches a range of rows a page at a time, yielding each page as a
+        list of ``(key, row)`` tuples.
+        """
+        def get_page(start_key, count):
+            key_range = KeyRange(start_key=start_key, end_key=finish, count=count)
+            return self._get_range_slices(column_parent, predicate, key_range,
+                                          include_timestamp,
+                                          read_consistency_level, raw)
+        return self._iter_pages(get_page, start, page_size, row_count)
+
+    def _get_indexed_pages(self, column_parent, index_clause, predicate,
+                           include_timestamp, read_consistency_level,
+                           page_size=None, row_count=None):
+        """
+        Fetches the rows matching an index clause a page at a time, yielding
+        each page as a list of ``(key, row)`` tuples.  The `count` of
+        `index_clause` is ignored.
+        """
+        def get_page(start_key, count):
+            clause = IndexClause(expressions=index_clause.expressions,
+                                 start_key=start_key, count=count)
+            return self._get_indexed_slices(column_parent, clause, predicate,
+                                            include_timestamp,
+                                            read_consistency_level)
+        return self._iter_pages(get_page, index_clause.start_key, page_size,
+                                row_count)
+
+    def _iter_pages(self, get_page, start, page_size, row_count):
+        """
+        Yields pages of ``(key, row)`` tuples from ``get_page(start_key,
+        count)``, which returns up to `count` rows from `start_key` on.
+
+        `page_size` is the number of rows to fetch at a time, or an
+        :class:`~pycassa.paging.AdaptivePageSize` to choose it for each
+        page; if None, `buffer_size` is used.
+        """
+        if page_size is None:
+            page_size = self.buffer_size
+        adaptive = isinstance(page_size, AdaptivePageSize)
+        count = 0
+        last_key = start
+        # Every page after the first starts with the last row of the page
+        # before it, which is skipped
+        skip = 0
+        while True:
+            limit = None
+            if row_count is not None:
+                limit = row_count - count + skip
+
+            def fetch(size):
+                if limit is not None:
+                    size = min(size, limit)
+                return get_page(last_key, size)
+
+            if adaptive:
+                key_slices, size = page_size.fetch(fetch, skip + 1)
+            else:
+                size = max(page_size, skip + 1)
+                key_slices = fetch(size)
+            if limit is not None:
+                size = min(size, limit)
+
+            page = key_slices[skip:]
+            count += len(page)
+            yield page
+
+            if len(key_slices) < size or (row_count is not None and count >= row_count):
+                return
+            last_key = key_slices[-1][0]
+            skip = 1
+
+    def get_range_columnar(self, start="", finish="", columns=None, column_start="",
+                           column_finish="", column_reversed=False, column_count=100,
+                           row_count=None, super_column=None,
+                           read_consistency_level=None):
+        """
+        Get an iterator over a range of rows in columnar form, one
+        page of `buffer_size` rows at a time.
+
+        Each page is a ``(keys, names, values)`` tuple of equal-length
+        sequences with one entry per column: the key of the row the column
+        belongs to, the column name and the column value.  Names and values
+        whose data type is ``LongType`` or ``IntegerType`` are decoded for
+        the whole page at once into a :class:`numpy.ndarray` if NumPy is
+        installed, or an :class:`array.array` otherwise.  Other names and
+        values are returned in lists, unpacked as usual.
+
+        Columns of a super column family can only be fetched from one
+        `super_column` at a time.
+
+        :Parameters:
+            `start`: str
+                Start from this key (inclusive)
+            `finish`: str
+                End at this key (inclusive)
+            `columns`: [str]
+                Limit the columns fetched to the specified list
+            `column_start`: str
+                Only fetch when a column is >= column_start
+            `column_finish`: str
+                Only fetch when a column is <= column_finish
+            `column_reversed`: bool
+                Fetch the columns in reverse order
+            `column_count`: int
+                Limit the number of columns fetched per key
+            `row_count`: int
+                Limit the number of rows fetched
+            `super_column`: string
+                Return columns only in this super_column
+            `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
+                Affects the guaranteed replication factor before returning from
+                any read operation
+
+        :Returns:
+            iterator over (['key'], ['column'], ['value'])
+        """
+        cp, sp = self._columnar_predicate(columns, column_start, column_finish,
+                                          column_reversed, column_count,
+                                          super_column)
+
+        for page in self._get_range_pages(cp, sp, start, finish, row_count, False,
+                                          self._rcl(read_consistency_level), True):
+            if page:
+                yield self._convert_rows_to_columnar(page)
+
+    def multiget_columnar(self, keys, columns=None, column_start="", column_finish="",
+                          column_reversed=False, column_count=100,
+                          super_column=None, read_consistency_level=None):
+        """
+        Fetch multiple keys in columnar form.
+
+        The result is a single ``(keys, names, values)`` tuple in the
+        format used by :meth:`get_range_columnar()`.  Rows appear in the
+        order of `keys`, and keys with no columns are left out.
+
+        :Parameters:
+            `keys`: [str]
+                A list of keys to fetch
+            `columns`: [str]
+                Limit the columns fetched to the specified list
+            `column_start`: str
+                Only fetch when a column is >= column_start
+            `column_finish`: str
+                Only fetch when a column is <= column_finish
+            `column_reversed`: bool
+                Fetch the columns in reverse order
+            `column_count`: int
+                Limit the number of columns fetched per key
+            `super_column`: str
+                Return columns only in this super_column
+            `read_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
+                Affects the guaranteed replication factor before returning from
+                any read operation
+
+        :Returns:
+            (['key'], ['column'], ['value'])
+        """
+        cp, sp = self._columnar_predicate(columns, column_start, column_finish,
+                                          column_reversed, column_count,
+                                          super_column)
+
+        keymap = self._multiget_slice(keys, cp, sp, False,
+                                      self._rcl(read_consistency_level), True)
+        return self._convert_rows_to_columnar([(key, keymap.get(key))
+                                               for key in keys])
+
+    def _slice_predicate(self, columns, column_start, column_finish,
+                         column_reversed, column_count, super_column):
+        """
+        Packs the slice arguments shared by the read methods into a
+        ColumnParent and a SlicePredicate.
+        """
         (super_column, column_start, column_finish) = self._pack_slice_cols(
                 super_column, column_start, column_finish)
 
@@ -625,36 +1967,48 @@ class ColumnFamily(object):
         cp = ColumnParent(column_family=self.column_family, super_column=super_column)
         sp = create_SlicePredicate(packed_cols, column_start, column_finish,
                                    column_reversed, column_count)
+        return cp, sp
 
-        count = 0
-        i = 0
-        last_key = start
+    def _cache_predicate(self, column_parent, predicate, include_timestamp):
+        """
+        Returns a hashable value that identifies the slice read by
+        `column_parent` and `predicate`, to key a row cache with.
+        """
+        names = predicate.column_names
+        if names is not None:
+            names = tuple(names)
+        slice_range = predicate.slice_range
+        if slice_range is not None:
+            slice_range = (slice_range.start, slice_range.finish,
+                           slice_range.reversed, slice_range.count)
+        return (column_parent.super_column, names, slice_range, include_timestamp)
+
+    def _columnar_predicate(self, columns, column_start, column_finish,
+                            column_reversed, column_count, super_column):
+        """
+        Builds the ColumnParent and SlicePredicate for a columnar read, which
+        always selects plain columns, even in a super column family.
+        """
+        if self.super and super_column is None:
+            raise ValueError('a super_column is required for columnar reads '
+                             'from a super column family')
+        if super_column is not None:
+            super_column = self._pack_name(super_column, is_supercol_name=True)
+        if column_start != '':
+            column_start = self._pack_name(column_start, slice_end=_SLICE_START)
+        if column_finish != '':
+            column_finish = self._pack_name(column_finish, slice_end=_SLICE_FINISH)
 
-        buffer_size = self.buffer_size
-        if row_count is not None:
-            buffer_size = min(row_count, self.buffer_size)
-        while True:
-            key_range = KeyRange(start_key=last_key, end_key=finish, count=buffer_size)
-            key_slices = self.client.get_range_slices(cp, sp, key_range,
-                                                     self._rcl(read_consistency_level))
-            # This may happen if nothing was ever inserted
-            if key_slices is None:
-                return
-            for j, key_slice in enumerate(key_slices):
-                # Ignore the first element after the first iteration
-                # because it will be a duplicate.
-                if j == 0 and i != 0:
-                    continue
-                yield (key_slice.key,
-                       self._convert_ColumnOrSuperColumns_to_dict_class(key_slice.columns, include_timestamp))
-                count += 1
-                if row_count is not None and count >= row_count:
-                    return
+        packed_cols = None
+        if columns is not None:
+            packed_cols = []
+            for col in columns:
+                packed_cols.append(self._pack_name(col))
 
-            if len(key_slices) != self.buffer_size:
-                return
-            last_key = key_slices[-1].key
-            i += 1
+        cp = ColumnParent(column_family=self.column_family, super_column=super_column)
+        sp = create_SlicePredicate(packed_cols, column_start, column_finish,
+                                   column_reversed, column_count)
+        return cp, sp
 
     def insert(self, key, columns, timestamp=None, ttl=None,
                write_consistency_level=None):
@@ -725,7 +2079,8 @@ class ColumnFamily(object):
         batch.send()
         return timestamp
 
-    def batch(self, queue_size=100, write_consistency_level=None):
+    def batch(self, queue_size=100, write_consistency_level=None,
+              direct_writes=None):
         """
         Create batch mutator for doing multiple insert, update, and remove
         operations using as few roundtrips as possible.
@@ -735,6 +2090,9 @@ class ColumnFamily(object):
                 Max number of mutations per request
             `write_consistency_level`: :class:`pycassa.cassandra.ttypes.ConsistencyLevel`
                 Consistency level used for mutations.
+            `direct_writes`: bool
+                Whether mutations should be serialized directly.  Defaults
+                to this column family's `direct_writes` setting.
 
         :Returns:
             :class:`pycassa.batch.CfMutator`
@@ -742,7 +2100,8 @@ class ColumnFamily(object):
         if write_consistency_level is None:
             write_consistency_level = self.write_consistency_level
         return CfMutator(self, queue_size=queue_size,
-                         write_consistency_level=write_consistency_level)
+                         write_consistency_level=write_consistency_level,
+                         direct_writes=direct_writes)
 
     def truncate(self):
         """
@@ -759,3 +2118,7 @@ class ColumnFamily(object):
 
         """
         self.client.truncate(self.column_family)
+        if self.row_cache is not None:
+            self.row_cache.clear()
+        if self.negative_cache is not None:
+            self.negative_cache.clear()
@@ -24,11 +24,11 @@ from thrift import Thrift
 from thrift.transport import TTransport
 from thrift.transport import TSocket
 from thrift.protocol import TBinaryProtocol
-from pycassa.cassandra import Cassandra
 from pycassa.cassandra.constants import VERSION
 from pycassa.cassandra.ttypes import AuthenticationRequest
 
 from batch import Mutator
+from wire import Client
 
 __all__ = ['connect', 'connect_thread_local', 'NoServerAvailable',
            'Connection']
@@ -55,7 +55,7 @@ class ClientTransport(object):
         else:
             transport = TTransport.TBufferedTransport(socket)
         protocol = TBinaryProtocol.TBinaryProtocolAccelerated(transport)
-        client = Cassandra.Client(protocol)
+        client = Client(protocol)
         transport.open()
 
         server_api_version = client.describe_version().split('.', 1)
@@ -187,6 +187,11 @@ class Connection(object):
         else:
             self._connection = None
 
+    @property
+    def keyspace(self):
+        """The keyspace this connection is associated with."""
+        return self._keyspace
+
     def connect(self):
         """Create new connection unless we already have one."""
         try:
@@ -0,0 +1,163 @@
+"""
+Hedged reads, which send a slow read again to another server.
+
+A node that pauses, for instance for garbage collection, holds up every
+read sent to it until it resumes, or until the client gives up on it.  A
+:class:`HedgePolicy` can be passed as the `hedge` of a
+:class:`~pycassa.columnfamily.ColumnFamily` to send a read that has not
+been answered within a delay again on a second client, and to return
+whichever answer comes first.  Only reads are hedged, since they may safely
+be sent twice.
+
+The second client should be connected to other servers than the column
+family's own client, for example::
+
+    >>> backup = pycassa.connect('Keyspace1', ['host2:9160', 'host3:9160'])
+    >>> cf = pycassa.ColumnFamily(client, 'Standard1',
+    ...                           hedge=HedgePolicy(backup, delay=0.02))
+
+Both requests are made on worker threads of the policy while the calling
+thread waits for the first answer, so both clients must be usable from
+several threads, like the one returned by
+:meth:`~pycassa.connection.connect()`; see :mod:`pycassa.workers`.  A
+request that loses is left to finish on its worker, and its answer is
+thrown away.
+
+"""
+
+import threading
+import time
+from collections import deque
+
+from pycassa.workers import CompletionQueue, WorkerPool
+
+__all__ = ['HedgePolicy']
+
+class HedgePolicy(object):
+    """
+    Sends a read again on `client` if it has not been answered after a
+    delay.
+
+    The delay is `delay` seconds from the start of the first request, or,
+    if `percentile` is set and at least `min_samples` reads have been
+    answered, that percentile of the time taken by the last `window`
+    successful first requests, but never less than `min_delay`.  Once the
+    read has been sent again, the first answer to either request is
+    returned, and if one request fails the other one is waited for.  The
+    exception of the first request is only raised if both fail.
+
+    The number of reads is kept in :attr:`calls`, the number that were
+    sent again in :attr:`hedged`, and the number where the second request
+    answered first in :attr:`won`.
+
+    """
+
+    def __init__(self, client, delay=0.05, percentile=None, min_delay=0.001,
+                 window=1000, min_samples=100, workers=None):
+        """
+        :Parameters:
+            `client`: :class:`~pycassa.connection.Connection`
+                The client to send reads to when they are hedged
+            `delay`: float
+                The number of seconds to wait for an answer before hedging
+            `percentile`: float
+                If set, the percentile, between 0 and 100, of recent read
+                times to wait for before hedging, in place of `delay`
+            `min_delay`: float
+                The shortest delay to use when `percentile` is set
+            `window`: int
+                The number of recent read times to keep
+            `min_samples`: int
+                The number of read times needed before `percentile` is used
+            `workers`: :class:`~pycassa.workers.WorkerPool`
+                The workers that send second requests.  By default the
+                policy has its own pool of eight workers, so that hedging
+                never holds up requests on
+                :meth:`~pycassa.workers.shared_pool()`.  When every worker is
+                busy, reads are sent again late.  First requests run on a
+                separate pool with no limit, so they are never held up.
+        """
+        self.client = client
+        self.delay = delay
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+        if workers is None:
+            workers = WorkerPool(8)
+        self.workers = workers
+        self._primaries = WorkerPool(None)
+        self.calls = 0
+        self.hedged = 0
+        self.won = 0
+        self._lock = threading.Lock()
+        self._times = deque()
+        self._current = delay
+        # The threshold is recomputed after this many reads
+        self._stale = 0
+
+    def current_delay(self):
+        """ Returns the number of seconds a read waits before being hedged. """
+        self._lock.acquire()
+        try:
+            if self.percentile is None or len(self._times) < self.min_samples:
+                return self.delay
+            if self._stale <= 0:
+                times = sorted(self._times)
+                index = int(len(times) * self.percentile / 100.0)
+                self._current = max(self.min_delay,
+                                    times[min(index, len(times) - 1)])
+                self._stale = max(1, self.window // 10)
+            return self._current
+        finally:
+            self._lock.release()
+
+    def _record(self, hedged, won):
+        self._lock.acquire()
+        try:
+            self.calls += 1
+            if hedged:
+                self.hedged += 1
+            if won:
+                self.won += 1
+        finally:
+            self._lock.release()
+
+    def _sample(self, future, started):
+        # Called when a first request finishes, even if it lost
+        if future._exc_info is not None:
+            return
+        elapsed = time.time() - started
+        self._lock.acquire()
+        try:
+            self._times.append(elapsed)
+            if len(self._times) > self.window:
+                self._times.popleft()
+            self._stale -= 1
+        finally:
+            self._lock.release()
+
+    def call(self, primary, func, *args):
+        """
+        Returns the result of ``func(*args, client=primary)``, or of
+        ``func(*args, client=self.client)`` if the read is sent again and
+        that call answers first.
+        """
+        started = time.time()
+        first = self._primaries.submit(func, *args, **{'client': primary})
+        first.add_done_callback(lambda future: self._sample(future, started))
+        finished = CompletionQueue()
+        finished.add(first)
+        delay = started + self.current_delay() - time.time()
+        future = finished.get(max(0, delay))
+        hedged = future is None
+        if hedged:
+            finished.add(self.workers.submit(func, *args,
+                                             **{'client': self.client}))
+            future = finished.get()
+            if future._exc_info is not None:
+                future = finished.get()
+                if future._exc_info is not None:
+                    future = first
+        self._record(hedged, future is not first)
+        return future.result()
@@ -0,0 +1,135 @@
+"""
+Adaptive sizing of the pages fetched by range and index scans.
+
+A fixed page size is either too large for fat rows, which makes requests
+time out, or too small for thin rows, which wastes round trips.  An
+:class:`AdaptivePageSize` can be passed as the `page_size` of
+:meth:`~pycassa.columnfamily.ColumnFamily.get_range()` or
+:meth:`~pycassa.columnfamily.ColumnFamily.get_indexed_slices()` to size
+each page by how large and how slow the previous pages were.
+
+"""
+
+import time
+
+from pycassa.cassandra.ttypes import TimedOutException
+from pycassa.rows import LazyRow
+
+__all__ = ['AdaptivePageSize', 'estimate_size']
+
+# Rows are sampled rather than measured in full to estimate their size
+_SAMPLE_ROWS = 8
+
+# The assumed size of anything that is not a string, such as a number
+_SCALAR_SIZE = 8
+
+def estimate_size(value):
+    """
+    Estimates the size in bytes of a row, or of any structure of strings,
+    numbers, mappings, lists and tuples, from the lengths of its strings.
+    A :class:`~pycassa.rows.LazyRow` is measured by its packed columns, so
+    estimating its size does not unpack it.
+    """
+    if isinstance(value, basestring):
+        return len(value)
+    if isinstance(value, LazyRow):
+        return value.packed_size()
+    if hasattr(value, 'iteritems'):
+        size = 0
+        for name, column in value.iteritems():
+            size += estimate_size(name) + estimate_size(column)
+        return size
+    if isinstance(value, (list, tuple)):
+        size = 0
+        for item in value:
+            size += estimate_size(item)
+        return size
+    return _SCALAR_SIZE
+
+def _estimate_page_size(rows):
+    """Estimates the total size in bytes of a page of rows."""
+    step = max(1, len(rows) // _SAMPLE_ROWS)
+    sample = rows[::step]
+    return estimate_size(sample) * len(rows) // len(sample)
+
+class AdaptivePageSize(object):
+    """
+    Chooses the number of rows to fetch in each page so that pages take
+    about `target_latency` seconds and hold about `target_bytes` bytes.
+
+    After each page, the next page is sized from the time and the estimated
+    size per row of the page just fetched.  A page grows by at most a factor
+    of two at a time, but shrinks right away.  When a page request raises
+    :exc:`~pycassa.cassandra.ttypes.TimedOutException`, the page is halved and
+    requested again; the exception is only raised once a page of `minimum`
+    rows times out.  Pages are then kept to the halved size, a limit which
+    is relaxed by a sixteenth after each successful page, since every
+    timeout costs a full RPC timeout.
+
+    The sizes that were chosen are kept in :attr:`sizes`, and the number of
+    page requests that timed out in :attr:`timeouts`.  An instance keeps
+    adapting across scans, so it can be reused for similar scans.
+
+    """
+
+    def __init__(self, initial=100, minimum=1, maximum=10000,
+                 target_latency=0.25, target_bytes=1048576):
+        """
+        :Parameters:
+            `initial`: int
+                The number of rows in the first page
+            `minimum`: int
+                The fewest rows to put in a page
+            `maximum`: int
+                The most rows to put in a page
+            `target_latency`: float
+                The time in seconds that fetching a page should take
+            `target_bytes`: int
+                The approximate size in bytes a page should have
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.target_bytes = target_bytes
+        self.size = max(minimum, min(maximum, initial))
+        self._ceiling = maximum
+        self.sizes = []
+        self.timeouts = 0
+
+    def fetch(self, get_page, minimum=1):
+        """
+        Calls ``get_page(count)`` with the current page size and returns a
+        ``(rows, count)`` tuple of its result and the size that was asked for.
+        Pages that time out are retried with half as many rows, down to
+        `minimum` rows or the :attr:`minimum` of this object, whichever is
+        larger.
+        """
+        floor = max(self.minimum, minimum)
+        while True:
+            count = max(self.size, floor)
+            started = time.time()
+            try:
+                rows = get_page(count)
+            except TimedOutException:
+                self.timeouts += 1
+                if count <= floor:
+                    raise
+                self.size = max(floor, count // 2)
+                self._ceiling = self.size
+                continue
+            self.sizes.append(count)
+            self._adapt(count, rows, time.time() - started)
+            return rows, count
+
+    def _adapt(self, count, rows, elapsed):
+        self._ceiling = min(self.maximum, self._ceiling + self._ceiling // 16 + 1)
+        if not rows:
+            return
+        desired = self.maximum
+        if elapsed > 0:
+            desired = min(desired, self.target_latency * len(rows) / elapsed)
+        size = _estimate_page_size(rows)
+        if size > 0:
+            desired = min(desired, self.target_bytes * len(rows) / size)
+        desired = int(min(desired, count * 2, self._ceiling))
+        self.size = max(self.minimum, min(self.maximum, desired))
@@ -0,0 +1,130 @@
+"""
+Row types that may be returned by :class:`~pycassa.columnfamily.ColumnFamily`
+reads in place of a fully built ``dict_class``.
+
+"""
+
+import struct
+from bisect import bisect_left
+from UserDict import DictMixin
+
+__all__ = ['LazyRow']
+
+class LazyRow(DictMixin):
+    """
+    A read-only mapping over the columns of a row that unpacks column
+    names and values only when they are first accessed.
+
+    The row holds on to the list of Thrift columns or super columns it
+    was built from.  Looking up a single column packs the requested name
+    and searches a sorted index of the packed names, so only that column
+    is ever unpacked.  Iteration follows the order the columns were
+    returned in, like a :class:`collections.OrderedDict` `dict_class`
+    would.
+
+    Use ``dict(row)`` to get a regular, mutable copy of the row.
+
+    """
+
+    def __init__(self, columns, unpack_name, pack_name, unpack_column):
+        """
+        :Parameters:
+            `columns`: list
+                Thrift :class:`~pycassa.cassandra.ttypes.Column` or
+                :class:`~pycassa.cassandra.ttypes.SuperColumn` objects
+            `unpack_name`: function
+                Unpacks the name of a column
+            `pack_name`: function
+                Packs a name passed by the caller for comparison with the
+                names in `columns`
+            `unpack_column`: function
+                Builds the value that will be returned for a column
+        """
+        self._columns = columns
+        self._unpack_name = unpack_name
+        self._pack_name = pack_name
+        self._unpack_column = unpack_column
+        self._names = None
+        self._values = {}
+        self._index = None
+
+    def packed_size(self):
+        """
+        Estimates the size in bytes of the row from the packed names and
+        values of its columns, without unpacking them.
+        """
+        size = 0
+        for column in self._columns:
+            size += len(column.name)
+            subcolumns = getattr(column, 'columns', None)
+            if subcolumns is None:
+                size += len(column.value)
+            else:
+                for subcolumn in subcolumns:
+                    size += len(subcolumn.name) + len(subcolumn.value)
+        return size
+
+    def _find(self, name):
+        """Returns the position of the column named `name`, or -1."""
+        if self._index is None:
+            self._index = sorted([(column.name, i)
+                                  for i, column in enumerate(self._columns)])
+        try:
+            packed = self._pack_name(name)
+        except (TypeError, ValueError, AttributeError, struct.error):
+            return -1
+        i = bisect_left(self._index, (packed,))
+        if i == len(self._index) or self._index[i][0] != packed:
+            return -1
+        pos = self._index[i][1]
+        # Different names may pack the same way, such as '5' and 5 for a
+        # LongType comparator; only an exact match counts as a hit
+        if self._name_at(pos) != name:
+            return -1
+        return pos
+
+    def _name_at(self, pos):
+        if self._names is not None:
+            return self._names[pos]
+        return self._unpack_name(self._columns[pos].name)
+
+    def _value_at(self, pos):
+        try:
+            return self._values[pos]
+        except KeyError:
+            value = self._values[pos] = self._unpack_column(self._columns[pos])
+            return value
+
+    def __getitem__(self, name):
+        pos = self._find(name)
+        if pos < 0:
+            raise KeyError(name)
+        return self._value_at(pos)
+
+    def __contains__(self, name):
+        return self._find(name) >= 0
+
+    has_key = __contains__
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        if self._names is None:
+            unpack_name = self._unpack_name
+            self._names = [unpack_name(column.name) for column in self._columns]
+        return list(self._names)
+
+    def iterkeys(self):
+        return self.__iter__()
+
+    def itervalues(self):
+        for pos in xrange(len(self._columns)):
+            yield self._value_at(pos)
+
+    def iteritems(self):
+        for pos, name in enumerate(self.keys()):
+            yield name, self._value_at(pos)
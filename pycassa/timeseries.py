@@ -0,0 +1,157 @@
+"""
+Storage of time series as compressed chunks, one column per time bucket.
+
+Each row of the column family holds one series.  The points that fall in
+the same bucket of `bucket_size` time units are stored together in a
+single :class:`~pycassa.types.TimeSeriesChunk` column named by the start
+of the bucket, so reading a long stretch of a series only takes a few
+columns.  The column family should use a ``LongType`` comparator.
+
+Chunks are written and read packed, so the validators of the column
+family do not apply to them.
+
+"""
+
+import struct
+
+from pycassa.types import TimeSeriesChunk
+
+__all__ = ['TimeSeries', 'TimeSeriesWriter']
+
+class TimeSeries(object):
+    """Reads and writes series of ``(timestamp, value)`` points."""
+
+    def __init__(self, column_family, bucket_size, column=None, page_size=100):
+        """
+        :Parameters:
+            `column_family`: :class:`~pycassa.columnfamily.ColumnFamily`
+                The column family to store the series in
+            `bucket_size`: int
+                The span of each bucket, in the units of the timestamps
+            `column`: :class:`~pycassa.types.Column`
+                Packs and unpacks the points of a bucket.  Defaults to a
+                :class:`~pycassa.types.TimeSeriesChunk`.
+            `page_size`: int
+                The number of buckets fetched at a time by :meth:`get()`
+
+        Raises :exc:`ValueError` if the column family packs column names
+        with a comparator other than ``LongType``.
+        """
+        if column_family.autopack_names and \
+                column_family.col_name_data_type != 'LongType':
+            raise ValueError('time series need a LongType comparator, not %s'
+                             % column_family.col_name_data_type)
+        if column is None:
+            column = TimeSeriesChunk()
+        self.column_family = column_family
+        self.bucket_size = bucket_size
+        self.column = column
+        self.page_size = page_size
+
+    def bucket(self, timestamp):
+        """ Returns the start of the bucket that `timestamp` falls in. """
+        return timestamp - timestamp % self.bucket_size
+
+    def _slice_bound(self, timestamp):
+        # Bounds are packed by the column family unless it leaves names alone
+        bucket = self.bucket(timestamp)
+        if self.column_family.autopack_names:
+            return bucket
+        return struct.pack('>q', bucket)
+
+    def writer(self, key):
+        """ Returns a :class:`TimeSeriesWriter` for the series in row `key`. """
+        return TimeSeriesWriter(self, key)
+
+    def put(self, key, points, write_consistency_level=None):
+        """
+        Stores `points` in their buckets, replacing whatever those buckets
+        held before.  The points must be in timestamp order.
+        """
+        writer = self.writer(key)
+        for timestamp, value in points:
+            writer.append(timestamp, value)
+        writer.seal(write_consistency_level)
+
+    def get(self, key, start=None, finish=None, read_consistency_level=None):
+        """
+        Fetches the points of a series in timestamp order.
+
+        :Parameters:
+            `key`: str
+                The row holding the series
+            `start`: int
+                Only return points with a timestamp >= start
+            `finish`: int
+                Only return points with a timestamp <= finish
+            `read_consistency_level`: :class:`~pycassa.cassandra.ttypes.ConsistencyLevel`
+                Affects the guaranteed replication factor before returning from
+                any read operation
+
+        :Returns:
+            [(timestamp, value)]
+        """
+        column_start = ''
+        if start is not None:
+            column_start = self._slice_bound(start)
+        column_finish = ''
+        if finish is not None:
+            column_finish = self._slice_bound(finish)
+
+        points = []
+        columns = self.column_family.xget(key, column_start=column_start,
+                column_finish=column_finish, buffer_size=self.page_size,
+                read_consistency_level=read_consistency_level, raw=True)
+        for name, value in columns:
+            for point in self.column.unpack(value):
+                if (start is None or point[0] >= start) and \
+                        (finish is None or point[0] <= finish):
+                    points.append(point)
+        return points
+
+class TimeSeriesWriter(object):
+    """
+    Buffers the points of one series and writes each bucket as a single
+    column once the series moves on to a later bucket.
+
+    Points must be appended in timestamp order.  Sealing a bucket replaces
+    any column already stored for it, so a bucket should be written in one
+    pass by one writer.
+
+    """
+
+    def __init__(self, series, key):
+        self.series = series
+        self.key = key
+        self._bucket = None
+        self._points = []
+        self._last_timestamp = None
+
+    def append(self, timestamp, value):
+        """
+        Adds a point, first sealing the current bucket if the point falls in
+        a later one.
+        """
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            raise ValueError('timestamps must not decrease')
+        self._last_timestamp = timestamp
+        bucket = self.series.bucket(timestamp)
+        if bucket != self._bucket:
+            self.seal()
+            self._bucket = bucket
+        self._points.append((timestamp, value))
+
+    def seal(self, write_consistency_level=None):
+        """ Writes the points of the current bucket, if there are any. """
+        if not self._points:
+            return
+        cf = self.series.column_family
+        packed = self.series.column.pack(self._points)
+        batch = cf.batch(write_consistency_level=write_consistency_level)
+        batch.insert(self.key, {struct.pack('>q', self._bucket): packed}, raw=True)
+        batch.send()
+        self._points = []
+
+    def close(self):
+        """ Seals the current bucket. """
+        self.seal()
@@ -1,9 +1,20 @@
+from binascii import hexlify, unhexlify
 from datetime import datetime
+import array
 import struct
+import sys
 import time
+import zlib
 
-__all__ = ['Column', 'DateTime', 'DateTimeString', 'Float64', 'FloatString',
-           'Int64', 'IntString', 'String']
+try:
+    import numpy
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+__all__ = ['Column', 'Compressed', 'DateTime', 'DateTimeString', 'Float64',
+           'Float64Array', 'FloatString', 'Int32Array', 'Int64', 'Int64Array',
+           'IntString', 'String', 'TimeSeriesChunk', 'ZlibCodec']
 
 class Column(object):
     """Base class for typed columns."""
@@ -95,3 +106,316 @@ class String(Column):
 
     def unpack(self, val):
         return val
+
+class _NumericArray(Column):
+    """
+    Base class for columns holding a sequence of fixed-width numbers, stored
+    as one contiguous big-endian buffer.
+
+    Values may be :class:`array.array` objects, NumPy arrays or any other
+    sequence of numbers.  They are unpacked into a NumPy array in native
+    byte order if NumPy is installed, or an :class:`array.array` otherwise.
+
+    """
+    #: The struct format character for one element
+    format = None
+    #: The :class:`array.array` typecodes that may hold one element
+    typecodes = ()
+
+    def __init__(self, *args, **kwargs):
+        Column.__init__(self, *args, **kwargs)
+        self.width = struct.calcsize(self.format)
+        self.typecode = None
+        for typecode in self.typecodes:
+            if array.array(typecode).itemsize == self.width:
+                self.typecode = typecode
+                break
+        if has_numpy:
+            self.dtype = numpy.dtype('>' + self.format)
+
+    def pack(self, val):
+        if has_numpy and isinstance(val, numpy.ndarray):
+            if not numpy.can_cast(val.dtype, self.dtype):
+                raise TypeError('expected an array of %s, %s found'
+                                % (self.dtype.name, val.dtype.name))
+            return val.astype(self.dtype).tostring()
+        if isinstance(val, basestring):
+            raise TypeError('expected a sequence of numbers, %s found'
+                            % type(val).__name__)
+        if self.typecode is None:
+            # No array typecode is wide enough on this platform
+            return struct.pack('>%d%s' % (len(val), self.format), *val)
+        values = array.array(self.typecode, val)
+        if sys.byteorder == 'little':
+            values.byteswap()
+        return values.tostring()
+
+    def unpack(self, val):
+        if has_numpy:
+            return numpy.frombuffer(val, dtype=self.dtype).astype(
+                    self.dtype.newbyteorder('='))
+        if self.typecode is None:
+            return list(struct.unpack('>%d%s' % (len(val) // self.width,
+                                                 self.format), val))
+        values = array.array(self.typecode)
+        values.fromstring(val)
+        if sys.byteorder == 'little':
+            values.byteswap()
+        return values
+
+class Int32Array(_NumericArray):
+    """Column for a sequence of 32bit ints."""
+    format = 'i'
+    typecodes = ('i', 'l')
+
+class Int64Array(_NumericArray):
+    """Column for a sequence of 64bit ints."""
+    format = 'q'
+    typecodes = ('l', 'i')
+
+class Float64Array(_NumericArray):
+    """Column for a sequence of 64bit floats."""
+    format = 'd'
+    typecodes = ('d',)
+
+class ZlibCodec(object):
+    """
+    Compresses :class:`Compressed` column values with :mod:`zlib`.
+
+    Other codecs may be used in its place; a codec needs a `tag`, which is
+    a one byte string other than ``'\\x00'`` or ``'\\xff'`` that marks the
+    values it compressed, and `compress` and `decompress` methods.
+
+    """
+    tag = '\x01'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+class Compressed(Column):
+    """
+    Column whose packed value is compressed once it reaches a size threshold.
+
+    Each value is prefixed with a tag byte: ``'\\x00'`` for a value stored
+    as-is, or the codec's tag for a compressed one.  Small values, and values
+    that do not get smaller, are stored as-is, so they cost one extra byte.
+    A :class:`unicode` value is stored as UTF-8 behind a further
+    ``'\\xff'`` byte, so that it is unpacked as :class:`unicode` again.
+    Values written without a :class:`Compressed` type cannot be read back
+    with one.
+
+    """
+    RAW_TAG = '\x00'
+    UNICODE_TAG = '\xff'
+
+    def __init__(self, column=None, threshold=1024, codec=None, *args, **kwargs):
+        """
+        :Parameters:
+            `column`: :class:`Column`
+                Packs values before they are compressed and unpacks them
+                after they are decompressed.  By default, values must be
+                :class:`str` or :class:`unicode` objects and are stored
+                as-is, with :class:`unicode` encoded as UTF-8.
+            `threshold`: int
+                Packed values shorter than this many bytes are never
+                compressed
+            `codec`: object
+                Compresses and decompresses values; a :class:`ZlibCodec`
+                is used by default
+        """
+        Column.__init__(self, *args, **kwargs)
+        self.column = column
+        self.threshold = threshold
+        if codec is None:
+            codec = ZlibCodec()
+        if codec.tag in (self.RAW_TAG, self.UNICODE_TAG):
+            raise ValueError('codec tag %r is reserved' % codec.tag)
+        self.codec = codec
+
+    def pack(self, val):
+        if self.column is not None:
+            val = self.column.pack(val)
+        elif not isinstance(val, basestring):
+            raise TypeError('expected str or unicode, %s found' % type(val).__name__)
+        prefix = ''
+        if isinstance(val, unicode):
+            prefix = self.UNICODE_TAG
+            val = val.encode('utf-8')
+        if len(val) >= self.threshold:
+            compressed = self.codec.compress(val)
+            if len(compressed) < len(val):
+                return prefix + self.codec.tag + compressed
+        return prefix + self.RAW_TAG + val
+
+    def unpack(self, val):
+        is_unicode = val[:1] == self.UNICODE_TAG
+        if is_unicode:
+            val = val[1:]
+        tag = val[:1]
+        if tag == self.RAW_TAG:
+            val = val[1:]
+        elif tag == self.codec.tag:
+            val = self.codec.decompress(val[1:])
+        else:
+            raise ValueError('unknown compression tag %r' % tag)
+        if is_unicode:
+            val = val.decode('utf-8')
+        if self.column is not None:
+            return self.column.unpack(val)
+        return val
+
+# The bit string of every byte, for reading TimeSeriesChunk values
+_BYTE_BITS = []
+for _byte in range(256):
+    _BYTE_BITS.append(''.join([str((_byte >> _bit) & 1)
+                               for _bit in range(7, -1, -1)]))
+
+# Bit prefixes and value widths for timestamp delta-of-deltas, smallest first
+_DELTA_CLASSES = (('10', 7), ('110', 9), ('1110', 12), ('1111', 64))
+
+def _bits(value, width):
+    """Returns the low `width` bits of `value` as a string of 0s and 1s."""
+    parts = []
+    for shift in range(0, width, 8):
+        parts.append(_BYTE_BITS[(value >> shift) & 0xff])
+    parts.reverse()
+    bits = ''.join(parts)
+    return bits[len(bits) - width:]
+
+class TimeSeriesChunk(Column):
+    """
+    Column for a list of ``(timestamp, value)`` points, compressed the way
+    Facebook's Gorilla compresses time series.
+
+    Timestamps must be integers in non-decreasing order, such as seconds or
+    milliseconds since the epoch; each one after the first is stored as the
+    change in the delta from the previous timestamp, which takes a single
+    bit for evenly spaced points.  Values are stored as floats; each one
+    after the first is XORed with the previous value and only the bits that
+    differ are stored, which takes a single bit for a repeated value.
+
+    """
+    _header = struct.Struct('>Iqd')
+    _float = struct.Struct('>d')
+    _uint64 = struct.Struct('>Q')
+
+    def pack(self, val):
+        if not val:
+            return struct.pack('>I', 0)
+        points = iter(val)
+        first_timestamp, first_value = points.next()
+        if not isinstance(first_timestamp, (int, long)):
+            raise TypeError('expected int or long timestamps, %s found'
+                            % type(first_timestamp).__name__)
+        first_value = float(first_value)
+        header = self._header.pack(len(val), first_timestamp, first_value)
+
+        float_pack = self._float.pack
+        uint64_unpack = self._uint64.unpack
+        bits = []
+        append = bits.append
+        prev_timestamp = first_timestamp
+        prev_delta = 0
+        prev_bits = uint64_unpack(float_pack(first_value))[0]
+        prev_leading = prev_trailing = -1
+        for timestamp, value in points:
+            if not isinstance(timestamp, (int, long)):
+                raise TypeError('expected int or long timestamps, %s found'
+                                % type(timestamp).__name__)
+            delta = timestamp - prev_timestamp
+            if delta < 0:
+                raise ValueError('timestamps must not decrease')
+            delta_of_delta = delta - prev_delta
+            if delta_of_delta == 0:
+                append('0')
+            else:
+                for prefix, width in _DELTA_CLASSES:
+                    limit = 1L << (width - 1)
+                    if -limit <= delta_of_delta < limit:
+                        break
+                append(prefix)
+                append(_bits(delta_of_delta, width))
+            prev_timestamp = timestamp
+            prev_delta = delta
+
+            value_bits = uint64_unpack(float_pack(float(value)))[0]
+            xor = value_bits ^ prev_bits
+            prev_bits = value_bits
+            if xor == 0:
+                append('0')
+                continue
+            xor_bits = _bits(xor, 64)
+            leading = min(len(xor_bits) - len(xor_bits.lstrip('0')), 31)
+            trailing = len(xor_bits) - len(xor_bits.rstrip('0'))
+            if prev_leading >= 0 and leading >= prev_leading and \
+                    trailing >= prev_trailing:
+                # The meaningful bits fit in the previous window
+                append('10')
+                append(xor_bits[prev_leading:64 - prev_trailing])
+            else:
+                meaningful = 64 - leading - trailing
+                append('11')
+                append(_bits(leading, 5))
+                append(_bits(meaningful & 0x3f, 6))
+                append(xor_bits[leading:64 - trailing])
+                prev_leading = leading
+                prev_trailing = trailing
+
+        bits = ''.join(bits)
+        if not bits:
+            return header
+        bits += '0' * (-len(bits) % 8)
+        return header + unhexlify('%0*x' % (len(bits) // 4, long(bits, 2)))
+
+    def unpack(self, val):
+        count = struct.unpack('>I', val[:4])[0]
+        if count == 0:
+            return []
+        count, timestamp, value = self._header.unpack(val[:self._header.size])
+        points = [(timestamp, value)]
+        bits = ''.join([_BYTE_BITS[ord(c)] for c in val[self._header.size:]])
+
+        float_unpack = self._float.unpack
+        uint64_pack = self._uint64.pack
+        value_bits = self._uint64.unpack(self._float.pack(value))[0]
+        delta = 0
+        leading = trailing = 0
+        pos = 0
+        for i in xrange(count - 1):
+            if bits[pos] == '0':
+                pos += 1
+            else:
+                for prefix, width in _DELTA_CLASSES:
+                    if bits.startswith(prefix, pos):
+                        break
+                pos += len(prefix)
+                delta_of_delta = int(bits[pos:pos + width], 2)
+                if delta_of_delta >= 1L << (width - 1):
+                    delta_of_delta -= 1L << width
+                pos += width
+                delta += delta_of_delta
+            timestamp += delta
+
+            if bits[pos] == '0':
+                pos += 1
+            else:
+                if bits[pos + 1] == '1':
+                    leading = int(bits[pos + 2:pos + 7], 2)
+                    meaningful = int(bits[pos + 7:pos + 13], 2) or 64
+                    trailing = 64 - leading - meaningful
+                    pos += 13
+                else:
+                    pos += 2
+                meaningful = 64 - leading - trailing
+                xor = long(bits[pos:pos + meaningful], 2) << trailing
+                pos += meaningful
+                value_bits ^= xor
+                value = float_unpack(uint64_pack(value_bits))[0]
+            points.append((timestamp, value))
+        return points
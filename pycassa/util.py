@@ -5,13 +5,33 @@ available for use by others working with pycassa.
 """
 
 import random
+import struct
+import threading
 import uuid
 import time
 
-__all__ = ['convert_time_to_uuid', 'convert_uuid_to_time']
+__all__ = ['convert_time_to_uuid', 'convert_time_to_uuid_bytes',
+           'convert_uuid_to_time', 'convert_uuid_bytes_to_time',
+           'TimeUUIDGenerator']
 
 _number_types = frozenset((int, long, float))
 
+# 0x01b21dd213814000 is the number of 100-ns intervals between the
+# UUID epoch 1582-10-15 00:00:00 and the Unix epoch 1970-01-01 00:00:00.
+_UUID_EPOCH_OFFSET = 0x01b21dd213814000L
+
+# time_low, time_mid and time_hi_version
+_time_fields = struct.Struct('>IHH')
+_clock_and_node = struct.Struct('>Q')
+
+# The RFC 4122 variant bits of the clock sequence
+_VARIANT = 0x8000000000000000L
+
+def _pack_time_fields(timestamp):
+    return _time_fields.pack(timestamp & 0xffffffffL,
+                             (timestamp >> 32) & 0xffff,
+                             ((timestamp >> 48) & 0x0fff) | 0x1000)
+
 def convert_time_to_uuid(time_arg, lowest_val=True, randomize=False):
     """
     Converts a datetime or timestamp to a type 1 UUID.
@@ -46,7 +66,36 @@ def convert_time_to_uuid(time_arg, lowest_val=True, randomize=False):
     """
     if isinstance(time_arg, uuid.UUID):
         return time_arg
+    if type(time_arg) is str and len(time_arg) == 16:
+        return uuid.UUID(bytes=time_arg)
+    timestamp, clock_and_node = _get_uuid_fields(time_arg, lowest_val, randomize)
+    time_hi_version = ((timestamp >> 48) & 0x0fff) | 0x1000
+    return uuid.UUID(int=((timestamp & 0xffffffffL) << 96) |
+                         (((timestamp >> 32) & 0xffff) << 80) |
+                         (time_hi_version << 64) | clock_and_node)
+
+def convert_time_to_uuid_bytes(time_arg, lowest_val=True, randomize=False):
+    """
+    Like :meth:`convert_time_to_uuid()`, but returns the 16 byte packed
+    form of the UUID without building a :class:`uuid.UUID`.
+
+    A UUID is converted to its packed form, and a 16 byte string is assumed
+    to already be a packed UUID and is returned unchanged.
 
+    """
+    if type(time_arg) is str and len(time_arg) == 16:
+        return time_arg
+    if isinstance(time_arg, uuid.UUID):
+        return time_arg.bytes
+
+    timestamp, clock_and_node = _get_uuid_fields(time_arg, lowest_val, randomize)
+    return _pack_time_fields(timestamp) + _clock_and_node.pack(clock_and_node)
+
+def _get_uuid_fields(time_arg, lowest_val, randomize):
+    """
+    Returns the 60 bit timestamp and the 64 bit clock sequence and node,
+    with the variant bits set, of the UUID for `time_arg`.
+    """
     nanoseconds = 0
     if hasattr(time_arg, 'timetuple'):
         nanoseconds = int(time.mktime(time_arg.timetuple()) * 1e9)
@@ -56,32 +105,17 @@ def convert_time_to_uuid(time_arg, lowest_val=True, randomize=False):
         raise ValueError('Argument for a v1 UUID column name or value was ' +
                 'neither a UUID, a datetime, or a number')
 
-    # 0x01b21dd213814000 is the number of 100-ns intervals between the
-    # UUID epoch 1582-10-15 00:00:00 and the Unix epoch 1970-01-01 00:00:00.
-    timestamp = int(nanoseconds/100) + 0x01b21dd213814000L
-
-    time_low = timestamp & 0xffffffffL
-    time_mid = (timestamp >> 32L) & 0xffffL
-    time_hi_version = (timestamp >> 48L) & 0x0fffL
+    timestamp = int(nanoseconds/100) + _UUID_EPOCH_OFFSET
 
     if randomize:
-        rand_bits = random.getrandbits(8 + 8 + 48)
-        clock_seq_low = rand_bits & 0xffL # 8 bits, no offset
-        clock_seq_hi_variant = (rand_bits & 0xff00L) / 0x100 # 8 bits, 8 offset
-        node = (rand_bits & 0xffffffffffff0000L) / 0x10000L # 48 bits, 16 offset
+        clock_and_node = random.getrandbits(62) | _VARIANT
+    elif lowest_val:
+        # Make the lowest value UUID with the same timestamp
+        clock_and_node = _VARIANT
     else:
-        if lowest_val:
-            # Make the lowest value UUID with the same timestamp
-            clock_seq_low = 0 & 0xffL
-            clock_seq_hi_variant = 0 & 0x3fL
-            node = 0 & 0xffffffffffffL # 48 bits
-        else:
-            # Make the highest value UUID with the same timestamp
-            clock_seq_low = 0xffL
-            clock_seq_hi_variant = 0x3fL
-            node = 0xffffffffffffL # 48 bits
-    return uuid.UUID(fields=(time_low, time_mid, time_hi_version,
-                        clock_seq_hi_variant, clock_seq_low, node), version=1)
+        # Make the highest value UUID with the same timestamp
+        clock_and_node = _VARIANT | 0x3fffffffffffffffL
+    return timestamp, clock_and_node
 
 def convert_uuid_to_time(uuid_arg):
     """
@@ -93,7 +127,85 @@ def convert_uuid_to_time(uuid_arg):
 
     """
     ts = uuid_arg.get_time()
-    return (ts - 0x01b21dd213814000L)/1e7
+    return (ts - _UUID_EPOCH_OFFSET)/1e7
+
+def convert_uuid_bytes_to_time(uuid_bytes):
+    """
+    Like :meth:`convert_uuid_to_time()`, but reads the timestamp straight
+    from the 16 byte packed form of a version 1 UUID, such as a
+    TimeUUIDType column name fetched with `autopack_names` disabled or
+    with ``raw=True``.
+
+    :param uuid_bytes: a packed version 1 UUID
+
+    """
+    time_low, time_mid, time_hi_version = _time_fields.unpack_from(uuid_bytes)
+    ts = ((time_hi_version & 0x0fff) << 48) | (time_mid << 32) | time_low
+    return (ts - _UUID_EPOCH_OFFSET)/1e7
+
+class TimeUUIDGenerator(object):
+    """
+    Generates packed version 1 UUIDs for the current time.
+
+    Every UUID from a generator has a later timestamp than the one
+    before it, even when the clock does not advance or steps backwards,
+    so they also sort in the order they were generated.  The clock
+    sequence and node are chosen once, so generating a UUID is little
+    more than packing its timestamp.
+
+    Values are 16 byte strings, which can be used directly as TimeUUIDType
+    column names or values.  A generator may be shared between threads.
+
+    """
+
+    def __init__(self, node=None, clock_seq=None):
+        """
+        :Parameters:
+            `node`: int
+                The 48 bit node of the generated UUIDs.  A random node
+                with the multicast bit set is used by default.
+            `clock_seq`: int
+                The 14 bit clock sequence of the generated UUIDs.  A
+                random one is used by default.
+        """
+        if node is None:
+            node = random.getrandbits(48) | 0x010000000000L
+        if clock_seq is None:
+            clock_seq = random.getrandbits(14)
+        self._clock_and_node = _clock_and_node.pack(
+                _VARIANT | ((clock_seq & 0x3fff) << 48) |
+                (node & 0xffffffffffffL))
+        self._last_timestamp = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, count):
+        """Returns the first of `count` consecutive unused timestamps."""
+        now = int(time.time() * 1e7) + _UUID_EPOCH_OFFSET
+        self._lock.acquire()
+        try:
+            first = max(now, self._last_timestamp + 1)
+            self._last_timestamp = first + count - 1
+        finally:
+            self._lock.release()
+        return first
+
+    def next(self):
+        """ Returns a new packed UUID. """
+        return _pack_time_fields(self._reserve(1)) + self._clock_and_node
+
+    def reserve(self, count):
+        """
+        Returns a list of `count` new packed UUIDs in ascending order, such
+        as the column names for a whole
+        :meth:`~pycassa.columnfamily.ColumnFamily.batch_insert()`.  The
+        generator's state is only updated once.
+        """
+        first = self._reserve(count)
+        pack = _time_fields.pack
+        clock_and_node = self._clock_and_node
+        return [pack(ts & 0xffffffffL, (ts >> 32) & 0xffff,
+                     ((ts >> 48) & 0x0fff) | 0x1000) + clock_and_node
+                for ts in range(first, first + count)]
 
 
 
@@ -0,0 +1,629 @@
+"""
+Direct encoding and decoding of the Thrift wire format.
+
+The generated Thrift code turns every response into a graph of
+:class:`~pycassa.cassandra.ttypes.ColumnOrSuperColumn`,
+:class:`~pycassa.cassandra.ttypes.Column` and
+:class:`~pycassa.cassandra.ttypes.KeySlice` objects which
+:class:`~pycassa.columnfamily.ColumnFamily` then walks a second time to
+build its own rows.  The :class:`Client` defined here reads the
+TBinaryProtocol payload of the slice calls itself and builds the final
+``dict_class`` rows in a single pass, unpacking names and values with the
+column family's codecs as it goes.
+
+Direct decoding requires a framed transport, which is the default for
+:func:`~pycassa.connection.connect()`.  Over a buffered transport the
+calls fall back to the regular Thrift decoding.
+
+In the other direction, :func:`encode_column_mutations` and
+:func:`encode_super_column_mutation` serialize packed columns straight
+into ``Mutation`` structs, and :meth:`Client.batch_mutate_direct` writes
+a ``batch_mutate`` call from those without building any
+:class:`~pycassa.cassandra.ttypes.Mutation` objects.  Large values, and
+values given as a :class:`buffer`, :class:`bytearray` or
+:class:`memoryview`, are not copied into the serialized structs; over a
+framed transport they are written to the socket as they are.
+
+"""
+
+import struct
+
+from thrift.Thrift import TApplicationException, TMessageType, TType
+from thrift.protocol import TBinaryProtocol
+from thrift.transport import TTransport
+
+from pycassa.cassandra import Cassandra
+
+__all__ = ['Client', 'RowReader', 'RawRowReader', 'encode_column_mutations',
+           'encode_super_column_mutation', 'encode_mutation']
+
+_i16 = struct.Struct('!h')
+_i32 = struct.Struct('!i')
+_i64 = struct.Struct('!q')
+_field_header = struct.Struct('!bh')
+_list_header = struct.Struct('!bi')
+_map_header = struct.Struct('!bbi')
+_string_field = struct.Struct('!bhi')
+_i64_field = struct.Struct('!bhq')
+_i32_field = struct.Struct('!bhi')
+_map_field = struct.Struct('!bhbbi')
+_list_field = struct.Struct('!bhbi')
+
+# The field headers of Mutation.column_or_supercolumn, then of
+# ColumnOrSuperColumn.column or .super_column, then of the name of the
+# column or super column, followed by the length of that name
+_mutation_header = struct.Struct('!bhbhbhi')
+
+_STOP = chr(TType.STOP)
+
+# Values at least this long are kept out of the joined strings and written
+# to the transport by themselves
+_LARGE_VALUE = 65536
+
+_FIXED_WIDTHS = {
+    TType.BOOL: 1,
+    TType.BYTE: 1,
+    TType.I16: 2,
+    TType.I32: 4,
+    TType.I64: 8,
+    TType.DOUBLE: 8,
+}
+
+def _identity(value):
+    return value
+
+class _UnexpectedResult(Exception):
+    """
+    Raised while decoding when the payload is not a plain success result,
+    in which case the generated Thrift code is used instead.
+    """
+    pass
+
+def _skip(data, pos, ttype):
+    """Returns the position just past a value of type `ttype`."""
+    width = _FIXED_WIDTHS.get(ttype)
+    if width is not None:
+        return pos + width
+    if ttype == TType.STRING:
+        return pos + 4 + _i32.unpack_from(data, pos)[0]
+    if ttype == TType.STRUCT:
+        while True:
+            ftype = ord(data[pos])
+            if ftype == TType.STOP:
+                return pos + 1
+            pos = _skip(data, pos + 3, ftype)
+    if ttype == TType.MAP:
+        ktype, vtype, size = _map_header.unpack_from(data, pos)
+        pos += 6
+        for i in xrange(size):
+            pos = _skip(data, pos, ktype)
+            pos = _skip(data, pos, vtype)
+        return pos
+    if ttype in (TType.LIST, TType.SET):
+        etype, size = _list_header.unpack_from(data, pos)
+        pos += 5
+        for i in xrange(size):
+            pos = _skip(data, pos, etype)
+        return pos
+    raise _UnexpectedResult('unknown type %d' % ttype)
+
+def _read_string(data, pos):
+    size = _i32.unpack_from(data, pos)[0]
+    pos += 4
+    return data[pos:pos + size], pos + size
+
+def _read_column(data, pos):
+    """Returns ``(name, value, timestamp, pos)`` for a Column struct."""
+    # Cassandra writes the name, value and timestamp fields in order, so
+    # try reading them with as few unpack calls as possible first
+    ftype, fid, size = _string_field.unpack_from(data, pos)
+    if ftype == TType.STRING and fid == 1:
+        pos += 7
+        name = data[pos:pos + size]
+        pos += size
+        ftype, fid, size = _string_field.unpack_from(data, pos)
+        if ftype == TType.STRING and fid == 2:
+            pos += 7
+            value = data[pos:pos + size]
+            pos += size
+            ftype, fid, timestamp = _i64_field.unpack_from(data, pos)
+            if ftype == TType.I64 and fid == 3:
+                pos += 11
+                if data[pos] == _STOP:
+                    return name, value, timestamp, pos + 1
+                return _read_column_fields(data, pos, name, value, timestamp)
+            return _read_column_fields(data, pos, name, value, None)
+        return _read_column_fields(data, pos, name, None, None)
+    return _read_column_fields(data, pos, None, None, None)
+
+def _read_column_fields(data, pos, name, value, timestamp):
+    while True:
+        ftype = ord(data[pos])
+        if ftype == TType.STOP:
+            return name, value, timestamp, pos + 1
+        fid = _i16.unpack_from(data, pos + 1)[0]
+        pos += 3
+        if fid == 1 and ftype == TType.STRING:
+            name, pos = _read_string(data, pos)
+        elif fid == 2 and ftype == TType.STRING:
+            value, pos = _read_string(data, pos)
+        elif fid == 3 and ftype == TType.I64:
+            timestamp = _i64.unpack_from(data, pos)[0]
+            pos += 8
+        else:
+            pos = _skip(data, pos, ftype)
+
+
+def _byte_length(value):
+    if isinstance(value, memoryview):
+        length = value.itemsize
+        for dim in value.shape:
+            length *= dim
+        return length
+    return len(value)
+
+def _coalesce(pieces):
+    """
+    Joins runs of short strings in `pieces`, leaving large values and
+    buffers as they are, and returns the list of resulting chunks.
+    """
+    ret = []
+    run = []
+    for piece in pieces:
+        if type(piece) is str and len(piece) < _LARGE_VALUE:
+            run.append(piece)
+        else:
+            if run:
+                ret.append(''.join(run))
+                run = []
+            ret.append(piece)
+    if run:
+        ret.append(''.join(run))
+    return ret
+
+def _column_suffix(timestamp, ttl):
+    """Encodes the fields following the value of a Column, and its stop."""
+    suffix = _i64_field.pack(TType.I64, 3, timestamp)
+    if ttl is not None:
+        suffix += _i32_field.pack(TType.I32, 4, ttl)
+    return suffix + _STOP
+
+def encode_column_mutations(columns, timestamp, ttl=None):
+    """
+    Encodes an iterable of packed ``(name, value)`` pairs as a list of
+    serialized ``Mutation`` structs inserting those columns.
+
+    A struct holding a large or buffer value is returned as a tuple of
+    pieces rather than a single string, so the value is not copied.
+
+    """
+    suffix = _column_suffix(timestamp, ttl) + _STOP + _STOP
+    header = _mutation_header.pack
+    value_header = _string_field.pack
+    ret = []
+    append = ret.append
+    for name, value in columns:
+        if type(value) is str and len(value) < _LARGE_VALUE:
+            append(''.join((
+                header(TType.STRUCT, 1, TType.STRUCT, 1, TType.STRING, 1, len(name)),
+                name, value_header(TType.STRING, 2, len(value)), value, suffix)))
+        else:
+            append((''.join((
+                header(TType.STRUCT, 1, TType.STRUCT, 1, TType.STRING, 1, len(name)),
+                name, value_header(TType.STRING, 2, _byte_length(value)))),
+                value, suffix))
+    return ret
+
+def encode_super_column_mutation(name, columns, timestamp, ttl=None):
+    """
+    Encodes a serialized ``Mutation`` struct inserting the packed
+    ``(name, value)`` pairs in `columns` into the super column `name`.
+    As with :func:`encode_column_mutations`, the struct is a tuple of
+    pieces if it holds any large or buffer values.
+
+    """
+    suffix = _column_suffix(timestamp, ttl)
+    field_header = _string_field.pack
+    pieces = [_mutation_header.pack(TType.STRUCT, 1, TType.STRUCT, 2,
+                                    TType.STRING, 1, len(name)),
+              name, _list_field.pack(TType.LIST, 2, TType.STRUCT, len(columns))]
+    for subname, subvalue in columns:
+        pieces.extend((field_header(TType.STRING, 1, len(subname)), subname,
+                       field_header(TType.STRING, 2, _byte_length(subvalue)),
+                       subvalue, suffix))
+    pieces.append(_STOP * 3)
+    chunks = _coalesce(pieces)
+    if len(chunks) == 1:
+        return chunks[0]
+    return tuple(chunks)
+
+def encode_mutation(mutation):
+    """Serializes a :class:`~pycassa.cassandra.ttypes.Mutation` object."""
+    buf = TTransport.TMemoryBuffer()
+    mutation.write(TBinaryProtocol.TBinaryProtocolAccelerated(buf))
+    return buf.getvalue()
+
+def _encode_batch_mutate_args(mutation_map, consistency_level):
+    """
+    Encodes the arguments of a ``batch_mutate`` call as a list of chunks
+    to be written in order.
+    """
+    large = False
+    pieces = [_map_field.pack(TType.MAP, 1, TType.STRING, TType.MAP,
+                              len(mutation_map))]
+    append = pieces.append
+    extend = pieces.extend
+    for key, cf_map in mutation_map.iteritems():
+        extend((_i32.pack(len(key)), key,
+                _map_header.pack(TType.STRING, TType.LIST, len(cf_map))))
+        for cf_name, mutations in cf_map.iteritems():
+            extend((_i32.pack(len(cf_name)), cf_name,
+                    _list_header.pack(TType.STRUCT, len(mutations))))
+            for mutation in mutations:
+                if type(mutation) is tuple:
+                    extend(mutation)
+                    large = True
+                else:
+                    append(mutation)
+    append(_i32_field.pack(TType.I32, 2, consistency_level))
+    append(_STOP)
+    if not large:
+        return [''.join(pieces)]
+    return _coalesce(pieces)
+
+
+class RowReader(object):
+    """
+    Builds rows for a :class:`~pycassa.columnfamily.ColumnFamily` straight
+    from the wire format, using the column family's name and value codecs.
+
+    """
+
+    def __init__(self, column_family, include_timestamp):
+        self.column_family = column_family
+        self.include_timestamp = include_timestamp
+        self.dict_class = column_family.dict_class
+        self.unpack_name = _identity
+        self.unpack_supercol_name = _identity
+        if column_family.autopack_names:
+            self.unpack_name = column_family._name_unpacker
+            self.unpack_supercol_name = column_family._supercol_name_unpacker
+        self.get_value_unpacker = None
+        if column_family._pack_values:
+            self.get_value_unpacker = column_family._value_unpackers.get
+            self.default_value_unpacker = column_family._default_value_unpacker
+
+    def convert(self, list_col_or_super):
+        """Converts an already decoded list of ColumnOrSuperColumns."""
+        return self.column_family._convert_ColumnOrSuperColumns_to_dict_class(
+                list_col_or_super, self.include_timestamp)
+
+    def new_row(self):
+        """Returns an empty row."""
+        return self.dict_class()
+
+    def read_columns(self, data, pos):
+        """
+        Reads a ``list<Column>`` starting at `pos` and returns the
+        row built from it along with the position following the list.
+
+        """
+        size = _list_header.unpack_from(data, pos)[1]
+        pos += 5
+        ret = self.dict_class()
+        unpack_name = self.unpack_name
+        get_value_unpacker = self.get_value_unpacker
+        include_timestamp = self.include_timestamp
+        for i in xrange(size):
+            name, value, timestamp, pos = _read_column(data, pos)
+            if get_value_unpacker is not None:
+                value = get_value_unpacker(name, self.default_value_unpacker)(value)
+            if include_timestamp:
+                value = (value, timestamp)
+            ret[unpack_name(name)] = value
+        return ret, pos
+
+    def read_row(self, data, pos):
+        """
+        Reads a ``list<ColumnOrSuperColumn>`` starting at `pos` and
+        returns the row built from it along with the position following
+        the list.
+
+        """
+        size = _list_header.unpack_from(data, pos)[1]
+        pos += 5
+        ret = self.dict_class()
+        unpack_name = self.unpack_name
+        get_value_unpacker = self.get_value_unpacker
+        include_timestamp = self.include_timestamp
+        for i in xrange(size):
+            while True:
+                ftype = ord(data[pos])
+                if ftype == TType.STOP:
+                    pos += 1
+                    break
+                fid = _i16.unpack_from(data, pos + 1)[0]
+                pos += 3
+                if fid == 1 and ftype == TType.STRUCT:
+                    name, value, timestamp, pos = _read_column(data, pos)
+                    if get_value_unpacker is not None:
+                        value = get_value_unpacker(name, self.default_value_unpacker)(value)
+                    if include_timestamp:
+                        value = (value, timestamp)
+                    ret[unpack_name(name)] = value
+                elif fid == 2 and ftype == TType.STRUCT:
+                    name, columns, pos = self._read_super_column(data, pos)
+                    ret[self.unpack_supercol_name(name)] = columns
+                else:
+                    pos = _skip(data, pos, ftype)
+        return ret, pos
+
+    def _read_super_column(self, data, pos):
+        name = None
+        columns = self.new_row()
+        while True:
+            ftype = ord(data[pos])
+            if ftype == TType.STOP:
+                return name, columns, pos + 1
+            fid = _i16.unpack_from(data, pos + 1)[0]
+            pos += 3
+            if fid == 1 and ftype == TType.STRING:
+                name, pos = _read_string(data, pos)
+            elif fid == 2 and ftype == TType.LIST:
+                columns, pos = self.read_columns(data, pos)
+            else:
+                pos = _skip(data, pos, ftype)
+
+    def read_key_slice(self, data, pos):
+        """Returns ``(key, row, pos)`` for a KeySlice struct."""
+        key = None
+        row = self.new_row()
+        while True:
+            ftype = ord(data[pos])
+            if ftype == TType.STOP:
+                return key, row, pos + 1
+            fid = _i16.unpack_from(data, pos + 1)[0]
+            pos += 3
+            if fid == 1 and ftype == TType.STRING:
+                key, pos = _read_string(data, pos)
+            elif fid == 2 and ftype == TType.LIST:
+                row, pos = self.read_row(data, pos)
+            else:
+                pos = _skip(data, pos, ftype)
+
+
+class RawRowReader(RowReader):
+    """
+    Builds rows as lists of packed ``(name, value)`` or
+    ``(name, value, timestamp)`` tuples, and super column rows as lists of
+    ``(name, columns)`` tuples, without unpacking anything.
+
+    """
+
+    def __init__(self, column_family, include_timestamp):
+        self.column_family = column_family
+        self.include_timestamp = include_timestamp
+
+    def convert(self, list_col_or_super):
+        return self.column_family._convert_ColumnOrSuperColumns_to_raw(
+                list_col_or_super, self.include_timestamp)
+
+    def new_row(self):
+        return []
+
+    def read_columns(self, data, pos):
+        size = _list_header.unpack_from(data, pos)[1]
+        pos += 5
+        ret = []
+        append = ret.append
+        if self.include_timestamp:
+            for i in xrange(size):
+                name, value, timestamp, pos = _read_column(data, pos)
+                append((name, value, timestamp))
+        else:
+            for i in xrange(size):
+                name, value, timestamp, pos = _read_column(data, pos)
+                append((name, value))
+        return ret, pos
+
+    def read_row(self, data, pos):
+        size = _list_header.unpack_from(data, pos)[1]
+        pos += 5
+        ret = []
+        append = ret.append
+        include_timestamp = self.include_timestamp
+        for i in xrange(size):
+            while True:
+                ftype = ord(data[pos])
+                if ftype == TType.STOP:
+                    pos += 1
+                    break
+                fid = _i16.unpack_from(data, pos + 1)[0]
+                pos += 3
+                if fid == 1 and ftype == TType.STRUCT:
+                    name, value, timestamp, pos = _read_column(data, pos)
+                    if include_timestamp:
+                        append((name, value, timestamp))
+                    else:
+                        append((name, value))
+                elif fid == 2 and ftype == TType.STRUCT:
+                    name, columns, pos = self._read_super_column(data, pos)
+                    append((name, columns))
+                else:
+                    pos = _skip(data, pos, ftype)
+        return ret, pos
+
+
+def _read_slice(reader, data, pos):
+    row, pos = reader.read_row(data, pos)
+    return row
+
+def _read_multiget_slice(reader, data, pos):
+    size = _map_header.unpack_from(data, pos)[2]
+    pos += 6
+    ret = {}
+    for i in xrange(size):
+        key, pos = _read_string(data, pos)
+        ret[key], pos = reader.read_row(data, pos)
+    return ret
+
+def _read_key_slices(reader, data, pos):
+    size = _list_header.unpack_from(data, pos)[1]
+    pos += 5
+    ret = []
+    for i in xrange(size):
+        key, row, pos = reader.read_key_slice(data, pos)
+        ret.append((key, row))
+    return ret
+
+def _convert_slice(reader, list_col_or_super):
+    return reader.convert(list_col_or_super)
+
+def _convert_multiget_slice(reader, keymap):
+    ret = {}
+    for key, columns in keymap.iteritems():
+        ret[key] = reader.convert(columns)
+    return ret
+
+def _convert_key_slices(reader, key_slices):
+    return [(key_slice.key, reader.convert(key_slice.columns))
+            for key_slice in key_slices]
+
+
+def _frame_output(trans):
+    """
+    Returns the transport beneath `trans` if `trans` is exactly the
+    TFramedTransport this module was written against, so that a frame may
+    be written to it directly, or None if the frame must go through
+    `trans` itself.
+    """
+    if type(trans) is not TTransport.TFramedTransport:
+        return None
+    out = getattr(trans, '_TFramedTransport__trans', None)
+    if out is None or not hasattr(out, 'write') or not hasattr(out, 'flush'):
+        return None
+    return out
+
+class Client(Cassandra.Client):
+    """
+    A :class:`~pycassa.cassandra.Cassandra.Client` with additional
+    ``*_direct`` variants of the slice calls.  These take a
+    :class:`RowReader` as their last argument and return rows in the
+    form used by :class:`~pycassa.columnfamily.ColumnFamily` instead of
+    Thrift objects:
+
+    - :meth:`get_slice_direct` returns a single row
+    - :meth:`multiget_slice_direct` returns ``{key: row}``
+    - :meth:`get_range_slices_direct` and :meth:`get_indexed_slices_direct`
+      return a list of ``(key, row)`` tuples
+
+    """
+
+    def get_slice_direct(self, key, column_parent, predicate,
+                         consistency_level, reader):
+        self.send_get_slice(key, column_parent, predicate, consistency_level)
+        return self._recv_direct(self.recv_get_slice, Cassandra.get_slice_result,
+                                 _read_slice, _convert_slice, reader)
+
+    def multiget_slice_direct(self, keys, column_parent, predicate,
+                              consistency_level, reader):
+        self.send_multiget_slice(keys, column_parent, predicate, consistency_level)
+        return self._recv_direct(self.recv_multiget_slice,
+                                 Cassandra.multiget_slice_result,
+                                 _read_multiget_slice, _convert_multiget_slice,
+                                 reader)
+
+    def get_range_slices_direct(self, column_parent, predicate, range,
+                                consistency_level, reader):
+        self.send_get_range_slices(column_parent, predicate, range, consistency_level)
+        return self._recv_direct(self.recv_get_range_slices,
+                                 Cassandra.get_range_slices_result,
+                                 _read_key_slices, _convert_key_slices, reader)
+
+    def get_indexed_slices_direct(self, column_parent, index_clause,
+                                  column_predicate, consistency_level, reader):
+        self.send_get_indexed_slices(column_parent, index_clause,
+                                     column_predicate, consistency_level)
+        return self._recv_direct(self.recv_get_indexed_slices,
+                                 Cassandra.get_indexed_slices_result,
+                                 _read_key_slices, _convert_key_slices, reader)
+
+    def batch_mutate_direct(self, mutation_map, consistency_level):
+        """
+        Like :meth:`batch_mutate`, but the innermost lists of
+        `mutation_map` hold ``Mutation`` structs that have already been
+        serialized, such as those produced by
+        :func:`encode_column_mutations`.
+
+        """
+        chunks = _encode_batch_mutate_args(mutation_map, consistency_level)
+        trans = self._oprot.trans
+        if len(chunks) > 1 and _frame_output(trans) is not None:
+            self._write_frame(trans, 'batch_mutate', chunks)
+        else:
+            self._oprot.writeMessageBegin('batch_mutate', TMessageType.CALL,
+                                          self._seqid)
+            for chunk in chunks:
+                trans.write(chunk)
+            self._oprot.writeMessageEnd()
+            trans.flush()
+        self.recv_batch_mutate()
+
+    def _write_frame(self, trans, name, chunks):
+        """
+        Writes a call as a single frame straight to the transport beneath
+        the framed transport `trans`, rather than copying `chunks` into the
+        frame buffer first.  Only used when :func:`_frame_output()` finds
+        that transport.
+        """
+        buf = TTransport.TMemoryBuffer()
+        TBinaryProtocol.TBinaryProtocol(
+                buf, strictWrite=getattr(self._oprot, 'strictWrite', True)
+                ).writeMessageBegin(name, TMessageType.CALL, self._seqid)
+        header = buf.getvalue()
+        size = len(header)
+        for chunk in chunks:
+            size += _byte_length(chunk)
+        out = _frame_output(trans)
+        # The first chunk always starts with the short map header
+        out.write(_i32.pack(size) + header + chunks[0])
+        for chunk in chunks[1:]:
+            out.write(chunk)
+        out.flush()
+
+    def _recv_direct(self, recv, result_class, read, convert, reader):
+        trans = self._iprot.trans
+        if not isinstance(trans, TTransport.TFramedTransport):
+            return convert(reader, recv())
+
+        (fname, mtype, rseqid) = self._iprot.readMessageBegin()
+        if mtype == TMessageType.EXCEPTION:
+            x = TApplicationException()
+            x.read(self._iprot)
+            self._iprot.readMessageEnd()
+            raise x
+
+        # The rest of the response is already sitting in the frame buffer
+        data = trans.cstringio_buf.read()
+        try:
+            ftype, fid = _field_header.unpack_from(data, 0)
+            if fid != 0 or ftype == TType.STOP:
+                raise _UnexpectedResult()
+            return read(reader, data, 3)
+        except (_UnexpectedResult, struct.error, IndexError):
+            return convert(reader, self._read_result(result_class, data, fname))
+
+    def _read_result(self, result_class, data, fname):
+        """Decodes `data` with the generated code, raising any exception."""
+        result = result_class()
+        result.read(TBinaryProtocol.TBinaryProtocol(TTransport.TMemoryBuffer(data)))
+        if result.success is not None:
+            return result.success
+        if result.ire is not None:
+            raise result.ire
+        if result.ue is not None:
+            raise result.ue
+        if result.te is not None:
+            raise result.te
+        raise TApplicationException(TApplicationException.MISSING_RESULT,
+                                    "%s failed: unknown result" % fname)
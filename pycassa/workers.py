@@ -0,0 +1,450 @@
+"""
+A small pool of worker threads for running requests in the background.
+
+The workers are long-lived, so a client that keeps one connection per
+thread, like the thread-local :class:`~pycassa.connection.Connection`
+returned by :meth:`~pycassa.connection.connect()`, opens one connection
+per worker and reuses it for every request that worker runs.
+
+A :class:`~pycassa.columnfamily.ColumnFamily` should only be used from
+worker threads if its client may be used from several threads at once.
+A connection checked out of a :mod:`~pycassa.pool` may not be.
+
+"""
+
+import sys
+import threading
+from collections import deque
+
+__all__ = ['Future', 'CompletionQueue', 'SingleFlight', 'Batcher', 'WorkerPool',
+           'shared_pool', 'prefetch']
+
+class Future(object):
+    """The eventual result of a call submitted to a :class:`WorkerPool`."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._result = None
+        self._exc_info = None
+
+    def _set_result(self, result):
+        self._result = result
+        self._finish()
+
+    def _set_exc_info(self, exc_info):
+        self._exc_info = exc_info
+        self._finish()
+
+    def _finish(self):
+        self._lock.acquire()
+        try:
+            self._event.set()
+            callbacks = self._callbacks
+            self._callbacks = []
+        finally:
+            self._lock.release()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                # A failing callback must not take down the worker thread
+                pass
+
+    def add_done_callback(self, callback):
+        """
+        Arranges for ``callback(future)`` to be called once the call has
+        finished, on the thread that ran it.  If the call has already
+        finished, `callback` is called right away.
+        """
+        self._lock.acquire()
+        try:
+            if not self._event.isSet():
+                self._callbacks.append(callback)
+                return
+        finally:
+            self._lock.release()
+        callback(self)
+
+    def done(self):
+        """ Returns whether the call has finished. """
+        return self._event.isSet()
+
+    def wait(self, timeout=None):
+        """
+        Waits up to `timeout` seconds, or forever if `timeout` is None, for
+        the call to finish, and returns whether it has.
+        """
+        self._event.wait(timeout)
+        return self._event.isSet()
+
+    def result(self):
+        """
+        Waits for the call to finish and returns its result, or raises the
+        exception that it raised.
+        """
+        self._event.wait()
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+class CompletionQueue(object):
+    """Hands back :class:`Future` objects in the order that they finish."""
+
+    def __init__(self):
+        self._finished = deque()
+        self._ready = threading.Condition(threading.Lock())
+
+    def add(self, future):
+        """ Starts watching `future`. """
+        future.add_done_callback(self._put)
+
+    def _put(self, future):
+        self._ready.acquire()
+        try:
+            self._finished.append(future)
+            self._ready.notify()
+        finally:
+            self._ready.release()
+
+    def get(self, timeout=None):
+        """
+        Waits up to `timeout` seconds, or forever if `timeout` is None, for
+        a watched future to finish, and returns it.  Each future is returned
+        once.  Returns None if none has finished in time.
+        """
+        self._ready.acquire()
+        try:
+            if timeout is None:
+                while not self._finished:
+                    self._ready.wait()
+            elif not self._finished:
+                self._ready.wait(timeout)
+            if not self._finished:
+                return None
+            return self._finished.popleft()
+        finally:
+            self._ready.release()
+
+class SingleFlight(object):
+    """
+    Shares one call between the threads that make the same call at the same
+    time.  The thread that makes a call first runs it, and the threads that
+    make it again before it has finished wait for it and receive its result
+    or its exception.
+
+    The number of calls that waited for another thread's call rather than
+    running their own is kept in :attr:`coalesced`.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def call(self, key, func, *args, **kwargs):
+        """
+        Returns the result of ``func(*args, **kwargs)``, or of the call with
+        the same hashable `key` that another thread is already running.
+        """
+        self._lock.acquire()
+        try:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self._calls[key] = Future()
+        finally:
+            self._lock.release()
+        if future is not None:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except:
+            exc_info = sys.exc_info()
+            self._forget(key)._set_exc_info(exc_info)
+            raise exc_info[0], exc_info[1], exc_info[2]
+        self._forget(key)._set_result(result)
+        return result
+
+    def _forget(self, key):
+        # Calls made from now on run again rather than sharing a result
+        # that is about to be handed out
+        self._lock.acquire()
+        try:
+            return self._calls.pop(key)
+        finally:
+            self._lock.release()
+
+class _Batch(object):
+
+    def __init__(self, args):
+        self.args = args
+        self.items = []
+        self.futures = {}
+        # Set once the batch is closed and about to be called
+        self.dispatched = threading.Event()
+
+class Batcher(object):
+    """
+    Gathers the items that threads ask for at about the same time into
+    batches, and makes one call for each batch.
+
+    The first thread to ask for an item in a group starts a batch and
+    waits `window` seconds for others to join it before making the call
+    for the batch.  A batch is called early, by the thread that fills it,
+    once it holds `max_items` items, and the thread that started it stops
+    waiting then.  Threads that ask for an item that is
+    already in the batch share its result.
+
+    The number of calls that were made is kept in :attr:`calls`, and the
+    number of items asked for in :attr:`items`.
+
+    """
+
+    def __init__(self, func, window=0.002, max_items=100):
+        """
+        :Parameters:
+            `func`: function
+                Called as ``func(items, *args)`` for each batch, and returns
+                a dict that maps each item to its result; items that are
+                left out get a result of None
+            `window`: float
+                The number of seconds a batch is kept open for
+            `max_items`: int
+                The most items to put in a batch
+        """
+        self.func = func
+        self.window = window
+        self.max_items = max_items
+        self.calls = 0
+        self.items = 0
+        self._lock = threading.Lock()
+        self._batches = {}
+
+    def call(self, group, item, *args):
+        """
+        Returns the result for `item`, which is fetched along with the other
+        items asked for in the same hashable `group`.  The `args` of the
+        thread that starts a batch are passed on to the function.
+        """
+        self._lock.acquire()
+        try:
+            self.items += 1
+            batch = self._batches.get(group)
+            started = batch is None
+            if started:
+                batch = self._batches[group] = _Batch(args)
+            future = batch.futures.get(item)
+            if future is None:
+                future = batch.futures[item] = Future()
+                batch.items.append(item)
+            full = len(batch.items) >= self.max_items
+            if full:
+                del self._batches[group]
+                batch.dispatched.set()
+        finally:
+            self._lock.release()
+
+        if not full and started:
+            batch.dispatched.wait(self.window)
+            self._lock.acquire()
+            try:
+                # The batch may have been filled and called in the meantime
+                full = self._batches.get(group) is batch
+                if full:
+                    del self._batches[group]
+                    batch.dispatched.set()
+            finally:
+                self._lock.release()
+        if full:
+            self._run(batch)
+        return future.result()
+
+    def _run(self, batch):
+        self._lock.acquire()
+        try:
+            self.calls += 1
+        finally:
+            self._lock.release()
+        try:
+            results = self.func(batch.items, *batch.args)
+        except:
+            exc_info = sys.exc_info()
+            for future in batch.futures.itervalues():
+                future._set_exc_info(exc_info)
+            return
+        for item, future in batch.futures.iteritems():
+            future._set_result(results.get(item))
+
+class WorkerPool(object):
+    """
+    Runs calls on a fixed number of daemon threads, which are started
+    when the first call is submitted.
+
+    If the number of workers is None, the pool has no limit: a thread is
+    started whenever a call is submitted while every worker is busy, and
+    idle workers are kept to run later calls.
+
+    """
+
+    def __init__(self, num_workers=4):
+        """
+        :Parameters:
+            `num_workers`: int
+                The number of worker threads, or None for no limit
+        """
+        self.num_workers = num_workers
+        self._tasks = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self._threads = []
+        # The number of workers that are not running a call
+        self._idle = 0
+
+    def _work(self):
+        while True:
+            self._ready.acquire()
+            try:
+                while not self._tasks:
+                    self._ready.wait()
+                future, func, args, kwargs = self._tasks.popleft()
+                self._idle -= 1
+            finally:
+                self._ready.release()
+            exc_info = None
+            try:
+                result = func(*args, **kwargs)
+            except:
+                exc_info = sys.exc_info()
+            # The worker counts as idle before the caller is woken, so that
+            # a call the caller makes next does not start another thread
+            self._ready.acquire()
+            try:
+                self._idle += 1
+            finally:
+                self._ready.release()
+            if exc_info is not None:
+                future._set_exc_info(exc_info)
+            else:
+                future._set_result(result)
+
+    def _start_worker(self):
+        thread = threading.Thread(target=self._work)
+        thread.setDaemon(True)
+        thread.start()
+        self._threads.append(thread)
+        self._idle += 1
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules ``func(*args, **kwargs)`` to run on a worker thread and
+        returns a :class:`Future` for its result.
+        """
+        future = Future()
+        self._ready.acquire()
+        try:
+            if self.num_workers is None:
+                # Every queued call must have an idle worker to run it
+                if self._idle <= len(self._tasks):
+                    self._start_worker()
+            else:
+                while len(self._threads) < self.num_workers:
+                    self._start_worker()
+            self._tasks.append((future, func, args, kwargs))
+            self._ready.notify()
+        finally:
+            self._ready.release()
+        return future
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def shared_pool():
+    """
+    Returns the :class:`WorkerPool` shared by everything in pycassa that
+    runs requests in the background, creating it on first use.
+    """
+    global _shared_pool
+    _shared_pool_lock.acquire()
+    try:
+        if _shared_pool is None:
+            _shared_pool = WorkerPool()
+        return _shared_pool
+    finally:
+        _shared_pool_lock.release()
+
+class _Prefetcher(object):
+    """Advances an iterator on worker threads, ahead of its consumer."""
+
+    def __init__(self, iterator, depth, workers):
+        self._iterator = iter(iterator)
+        self._depth = depth
+        self._workers = workers
+        self._lock = threading.Lock()
+        # Futures for the items fetched ahead, in order; the last one may
+        # still be running
+        self._items = deque()
+        self._running = False
+        self._done = False
+        self._lock.acquire()
+        try:
+            self._fill()
+        finally:
+            self._lock.release()
+
+    def __iter__(self):
+        return self
+
+    def _fill(self):
+        # Only one call to the iterator may run at a time
+        if not self._running and not self._done and len(self._items) < self._depth:
+            self._running = True
+            self._items.append(self._workers.submit(self._advance))
+
+    def _advance(self):
+        try:
+            item = self._iterator.next()
+        except:
+            self._finish(True)
+            raise
+        self._finish(False)
+        return item
+
+    def _finish(self, done):
+        self._lock.acquire()
+        try:
+            self._running = False
+            self._done = done
+            self._fill()
+        finally:
+            self._lock.release()
+
+    def next(self):
+        self._lock.acquire()
+        try:
+            # The next call is always queued before the previous one's
+            # result is set, so nothing is queued only at the end
+            if not self._items:
+                raise StopIteration
+            future = self._items.popleft()
+            self._fill()
+        finally:
+            self._lock.release()
+        return future.result()
+
+def prefetch(iterator, depth=1, workers=None):
+    """
+    Returns an iterator over the items of `iterator`, which is advanced on
+    worker threads so that up to `depth` items are fetched ahead of the
+    caller.  Only one item is fetched at a time.
+
+    If `workers` is None, :meth:`shared_pool()` is used.
+    """
+    if depth < 1:
+        raise ValueError('depth must be at least 1')
+    if workers is None:
+        workers = shared_pool()
+    return _Prefetcher(iterator, depth, workers)
@@ -603,3 +603,39 @@ class TestAutoPacking:
         uuid_res = self.cf_time.get(key).keys()[0]
         timestamp = convert_uuid_to_time(uuid_res)
         assert_almost_equal(timestamp, t, places=3)
+
+    def test_columnar(self):
+        self.clear()
+
+        self.cf_def_valid.insert('key1', {'aaaaaa': 1L, 'bbbbbb': 2L})
+        self.cf_def_valid.insert('key2', {'aaaaaa': 3L})
+        keys, names, values = self.cf_def_valid.multiget_columnar(['key2', 'key1', 'key3'])
+        assert_equal(keys, ['key2', 'key1', 'key1'])
+        assert_equal(names, ['aaaaaa', 'aaaaaa', 'bbbbbb'])
+        assert_equal(list(values), [3L, 1L, 2L])
+
+        self.cf_long.insert('key1', {1L: 'a', 2L: 'b'})
+        pages = list(self.cf_long.get_range_columnar())
+        assert_equal(len(pages), 1)
+        keys, names, values = pages[0]
+        assert_equal(keys, ['key1', 'key1'])
+        assert_equal(list(names), [1L, 2L])
+        assert_equal(values, ['a', 'b'])
+
+        assert_raises(ValueError, self.cf_suplong.multiget_columnar, ['key1'])
+
+    def test_time_uuid_generator(self):
+        self.clear()
+
+        key = 'key'
+
+        gen = TimeUUIDGenerator()
+        names = gen.reserve(3)
+        self.cf_time.insert(key, dict([(name, 'val') for name in names]))
+        self.cf_valid_time.insert(key, {'subcol': gen.next()})
+
+        uuids = [uuid.UUID(bytes=name) for name in names]
+        assert_equal(self.cf_time.get(key).keys(), uuids)
+        assert_equal(self.cf_valid_time.get(key)['subcol'] > uuids[-1], True)
+        for name, u in zip(names, uuids):
+            assert_equal(convert_uuid_bytes_to_time(name), convert_uuid_to_time(u))
@@ -117,3 +117,18 @@ assert self.cf.get('3') == ROWS['3']"""
 
 
 
+
+    def test_direct_writes(self):
+        batch = self.cf.batch(direct_writes=True)
+        for key, cols in ROWS.iteritems():
+            batch.insert(key, cols)
+        batch.remove('3', ['a'])
+        batch.send()
+        assert self.cf.get('1') == ROWS['1']
+        assert self.cf.get('2') == ROWS['2']
+        assert self.cf.get('3') == {'b': '345'}
+
+        batch = self.scf.batch(direct_writes=True)
+        batch.insert('one', ROWS, ttl=60)
+        batch.send()
+        assert self.scf.get('one') == ROWS
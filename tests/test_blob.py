@@ -0,0 +1,56 @@
+from cStringIO import StringIO
+
+from pycassa import connect, ColumnFamily, ConsistencyLevel, NotFoundException
+from pycassa.blob import BlobStore
+
+from nose.tools import assert_raises, assert_equal
+
+class TestBlobStore:
+    def setUp(self):
+        credentials = {'username': 'jsmith', 'password': 'havebadpass'}
+        self.client = connect('Keyspace1', credentials=credentials)
+        self.cf = ColumnFamily(self.client, 'Blob1',
+                               write_consistency_level=ConsistencyLevel.ONE,
+                               timestamp=self.timestamp)
+        self.store = BlobStore(self.cf, chunk_size=10, queue_size=3, page_size=2)
+        self.timestamp_n = 0
+        self.clear()
+
+    def timestamp(self):
+        self.timestamp_n += 1
+        return self.timestamp_n
+
+    def clear(self):
+        self.cf.truncate()
+
+    def test_put_get(self):
+        key = 'TestBlobStore.test_put_get'
+        data = ''.join([chr(i % 256) for i in xrange(1234)])
+        assert_equal(self.store.put(key, data), len(data))
+        assert_equal(self.store.get(key), data)
+        assert_equal(self.cf.get_count(key), 124)
+
+        # A shorter value replaces every chunk of the old one
+        assert_equal(self.store.put(key, StringIO(data[:25])), 25)
+        assert_equal(self.store.get(key), data[:25])
+        assert_equal(self.cf.get_count(key), 3)
+
+        self.store.put(key, '')
+        assert_equal(self.store.get(key), '')
+
+        self.store.remove(key)
+        assert_raises(NotFoundException, self.store.open, key)
+
+    def test_read(self):
+        key = 'TestBlobStore.test_read'
+        data = 'abcdefghij' * 10 + 'xyz'
+        self.store.put(key, data)
+        for prefetch in (True, False):
+            self.store.prefetch = prefetch
+            reader = self.store.open(key)
+            assert_equal(reader.read(3), data[:3])
+            assert_equal(reader.read(15), data[3:18])
+            assert_equal(reader.tell(), 18)
+            assert_equal(reader.read(), data[18:])
+            assert_equal(reader.read(), '')
+            reader.close()
@@ -1,8 +1,15 @@
 from pycassa import connect, connect_thread_local, index, ColumnFamily, ConsistencyLevel, NotFoundException
 
+from pycassa.rows import LazyRow
+from pycassa.types import Compressed
+from pycassa.paging import AdaptivePageSize, estimate_size
+from pycassa.cache import RowCache, NegativeCache
+from pycassa.hedging import HedgePolicy
+
 from nose.tools import assert_raises, assert_equal
 
 import struct
+import threading
 
 class TestDict(dict):
     pass
@@ -51,6 +58,19 @@ class TestColumnFamily:
         self.cf.insert(key, columns)
         assert self.cf.get(key) == columns
 
+    def test_xget(self):
+        key = 'TestColumnFamily.test_xget'
+        columns = dict(('%02d' % i, 'val%d' % i) for i in xrange(7))
+        self.cf.insert(key, columns)
+
+        expected = sorted(columns.items())
+        assert_equal(list(self.cf.xget(key)), expected)
+        assert_equal(list(self.cf.xget(key, column_reversed=True)), expected[::-1])
+        assert_equal(list(self.cf.xget(key, column_start='02', column_count=3)),
+                     expected[2:5])
+        assert_equal(list(self.cf.xget(key, prefetch=1)), expected)
+        assert_equal(list(self.cf.xget('missing')), [])
+
     def test_insert_multiget(self):
         key1 = 'TestColumnFamily.test_insert_multiget1'
         columns1 = {'1': 'val1', '2': 'val2'}
@@ -66,6 +86,12 @@ class TestColumnFamily:
         assert rows[key2] == columns2
         assert missing_key not in rows
 
+        chunked = self.cf.multiget([key1, key2, missing_key], chunk_size=1)
+        assert_equal(chunked, rows)
+
+        streamed = self.cf.multiget_iter([key1, key2, missing_key], chunk_size=1)
+        assert_equal(dict(streamed), rows)
+
     def test_insert_get_count(self):
         key = 'TestColumnFamily.test_insert_get_count'
         columns = {'1': 'val1', '2': 'val2'}
@@ -79,6 +105,28 @@ class TestColumnFamily:
         assert_equal(self.cf.get_count(key, columns=['1','2']), 2)
         assert_equal(self.cf.get_count(key, columns=['1']), 1)
 
+    def test_paged_count(self):
+        key = 'TestColumnFamily.test_paged_count'
+        columns = dict(('%02d' % i, 'val') for i in range(25))
+        self.cf.insert(key, columns)
+
+        assert_equal(self.cf.get_count(key, page_size=4), 25)
+        assert_equal(self.cf.get_count(key, page_size=1, column_start='10'), 15)
+        progress = []
+        assert_equal(self.cf.get_count(key, page_size=3, splits=['05', '10', '17'],
+                                       callback=progress.append), 25)
+        assert_equal(progress[-1], 25)
+        assert_equal(self.cf.get_count(key, splits=['05', '10'], column_start='03',
+                                       column_finish='12'), 10)
+
+        keys = [key, 'TestColumnFamily.test_paged_count2', 'missing']
+        self.cf.insert(keys[1], {'1': 'val1'})
+        counted = {}
+        result = self.cf.multiget_count(keys, chunk_size=1, page_size=5,
+                                        callback=counted.__setitem__)
+        assert_equal(result, {keys[0]: 25, keys[1]: 1, keys[2]: 0})
+        assert_equal(counted, result)
+
     def test_insert_multiget_count(self):
         keys = ['TestColumnFamily.test_insert_multiget_count1',
                'TestColumnFamily.test_insert_multiget_count2',
@@ -127,6 +175,25 @@ class TestColumnFamily:
             assert k == keys[i]
             assert c == columns
 
+        prefetched = self.cf.get_range(start=keys[0], finish=keys[-1], prefetch=2)
+        assert_equal(list(prefetched), rows)
+
+        sizer = AdaptivePageSize(initial=2)
+        adaptive = self.cf.get_range(start=keys[0], finish=keys[-1], page_size=sizer)
+        assert_equal(list(adaptive), rows)
+        assert len(sizer.sizes) > 0
+
+    def test_insert_get_range_parallel(self):
+        keys = ['TestColumnFamily.test_insert_get_range_parallel%s' % i for i in xrange(5)]
+        columns = {'1': 'val1', '2': 'val2'}
+        for key in keys:
+            self.cf.insert(key, columns)
+
+        rows = dict(self.cf.get_range_parallel(keys_per_split=2))
+        assert_equal(rows, dict(self.cf.get_range()))
+        for key in keys:
+            assert_equal(rows[key], columns)
+
     def test_insert_get_indexed_slices(self):
         indexed_cf = ColumnFamily(self.client, 'Indexed1')
 
@@ -149,6 +216,232 @@ class TestColumnFamily:
         assert result.get('key2') == columns
         assert result.get('key3') == columns
 
+        assert_equal(indexed_cf.get_indexed_slices(clause, page_size=2), result)
+
+        rows = list(indexed_cf.get_indexed_slices_iter(clause, page_size=2))
+        assert_equal(dict(rows), result)
+        rows = indexed_cf.get_indexed_slices_iter(clause, page_size=1, prefetch=1)
+        assert_equal(dict(rows), result)
+        assert_equal(len(list(indexed_cf.get_indexed_slices_iter(clause, row_count=2))), 2)
+        assert_equal(list(indexed_cf.get_indexed_slices_iter(clause, max_bytes=1)), [])
+
+        expr = index.create_index_expression(column_name='birthdate', value=2L)
+        clause = index.create_index_clause([expr])
+        assert_equal(list(indexed_cf.get_indexed_slices_iter(clause)), [])
+
+    def test_direct_reads(self):
+        direct_cf = ColumnFamily(self.client, 'Standard2', dict_class=TestDict,
+                                 direct_reads=True)
+        key1 = 'TestColumnFamily.test_direct_reads1'
+        key2 = 'TestColumnFamily.test_direct_reads2'
+        columns = {'1': 'val1', '2': 'val2'}
+        self.cf.insert(key1, columns)
+        self.cf.insert(key2, columns)
+
+        assert_equal(direct_cf.get(key1), columns)
+        assert isinstance(direct_cf.get(key1), TestDict)
+        assert_equal(direct_cf.get(key1, include_timestamp=True),
+                     self.cf.get(key1, include_timestamp=True))
+        assert_raises(NotFoundException, direct_cf.get, 'missing')
+        assert_equal(direct_cf.multiget([key1, 'missing', key2]),
+                     {key1: columns, key2: columns})
+        assert_equal(list(direct_cf.get_range(start=key1, finish=key2)),
+                     list(self.cf.get_range(start=key1, finish=key2)))
+
+    def test_lazy_rows(self):
+        lazy_cf = ColumnFamily(self.client, 'Standard2', lazy_rows=True)
+        key = 'TestColumnFamily.test_lazy_rows'
+        columns = {'1': 'val1', '2': 'val2'}
+        self.cf.insert(key, columns)
+
+        row = lazy_cf.get(key)
+        assert isinstance(row, LazyRow)
+        assert_equal(row['2'], 'val2')
+        assert '3' not in row
+        assert_raises(KeyError, row.__getitem__, '3')
+        assert_equal(row.keys(), ['1', '2'])
+        assert_equal(row, columns)
+        assert_equal(lazy_cf.multiget([key]), {key: columns})
+        assert_equal(list(lazy_cf.get_range(start=key, finish=key)), [(key, columns)])
+
+    def test_lazy_row_size(self):
+        lazy_cf = ColumnFamily(self.client, 'Standard2', lazy_rows=True,
+                               row_cache=RowCache(max_bytes=3000))
+        key1 = 'TestColumnFamily.test_lazy_row_size1'
+        key2 = 'TestColumnFamily.test_lazy_row_size2'
+        columns = {'1': 'x' * 1000, '2': 'y' * 1000}
+        self.cf.insert(key1, columns)
+        self.cf.insert(key2, columns)
+
+        row = lazy_cf.get(key1)
+        assert_equal(estimate_size(row), 2002)
+        assert_equal(estimate_size(row), estimate_size(columns))
+
+        # Both rows do not fit in the cache at once
+        lazy_cf.get(key2)
+        lazy_cf.get(key1)
+        assert_equal(lazy_cf.row_cache.misses, 3)
+
+    def test_row_cache(self):
+        cached_cf = ColumnFamily(self.client, 'Standard2', timestamp=self.timestamp,
+                                 row_cache=RowCache())
+        key1 = 'TestColumnFamily.test_row_cache1'
+        key2 = 'TestColumnFamily.test_row_cache2'
+        columns = {'1': 'val1', '2': 'val2'}
+        cached_cf.insert(key1, columns)
+        cached_cf.insert(key2, columns)
+
+        assert_equal(cached_cf.get(key1), columns)
+        assert_equal(cached_cf.row_cache.misses, 1)
+        assert_equal(cached_cf.get(key1), columns)
+        assert_equal(cached_cf.row_cache.hits, 1)
+        assert_equal(cached_cf.get(key1, columns=['1']), {'1': 'val1'})
+        assert_equal(cached_cf.row_cache.misses, 2)
+
+        assert_equal(cached_cf.multiget([key1, 'missing', key2]),
+                     {key1: columns, key2: columns})
+        assert_equal(cached_cf.row_cache.hits, 2)
+        # A key asked for twice is only looked up once
+        assert_equal(cached_cf.multiget([key2, key1, key2]),
+                     {key2: columns, key1: columns})
+        assert_equal(cached_cf.row_cache.hits, 4)
+
+        cached_cf.insert(key1, {'1': 'new'})
+        assert_equal(cached_cf.get(key1)['1'], 'new')
+        cached_cf.remove(key2)
+        assert_raises(NotFoundException, cached_cf.get, key2)
+
+    def test_negative_cache(self):
+        cached_cf = ColumnFamily(self.client, 'Standard2', timestamp=self.timestamp,
+                                 negative_cache=NegativeCache())
+        key = 'TestColumnFamily.test_negative_cache'
+        columns = {'1': 'val1', '2': 'val2'}
+
+        assert_raises(NotFoundException, cached_cf.get, key)
+        assert_raises(NotFoundException, cached_cf.get, key)
+        assert_equal(cached_cf.negative_cache.hits, 1)
+        assert_equal(cached_cf.multiget([key, key]), {})
+        assert_equal(cached_cf.negative_cache.hits, 2)
+
+        cached_cf.insert(key, columns)
+        assert_equal(cached_cf.get(key), columns)
+        assert_equal(cached_cf.multiget([key]), {key: columns})
+
+    def test_coalesce_reads(self):
+        coalesced_cf = ColumnFamily(self.client, 'Standard2', coalesce_reads=True)
+        key = 'TestColumnFamily.test_coalesce_reads'
+        columns = {'1': 'val1', '2': 'val2'}
+        self.cf.insert(key, columns)
+
+        results = []
+        def read():
+            results.append((coalesced_cf.get(key), coalesced_cf.multiget([key]),
+                            coalesced_cf.get_count(key)))
+        threads = [threading.Thread(target=read) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert_equal(results, [(columns, {key: columns}, 2)] * 10)
+        assert_raises(NotFoundException, coalesced_cf.get, 'missing')
+
+    def test_read_batching(self):
+        batched_cf = ColumnFamily(self.client, 'Standard2', read_batch_window=0.05)
+        keys = ['TestColumnFamily.test_read_batching%d' % i for i in range(10)]
+        columns = {'1': 'val1', '2': 'val2'}
+        for key in keys:
+            self.cf.insert(key, columns)
+
+        results = {}
+        def read(key):
+            results[key] = batched_cf.get(key)
+        threads = [threading.Thread(target=read, args=(key,)) for key in keys]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert_equal(results, dict((key, columns) for key in keys))
+        assert batched_cf._read_batcher.calls < len(keys)
+        assert_raises(NotFoundException, batched_cf.get, 'missing')
+
+    def test_hedge(self):
+        credentials = {'username': 'jsmith', 'password': 'havebadpass'}
+        hedge = HedgePolicy(connect('Keyspace1', credentials=credentials), delay=0)
+        hedged_cf = ColumnFamily(self.client, 'Standard2', hedge=hedge)
+        key = 'TestColumnFamily.test_hedge'
+        columns = {'1': 'val1', '2': 'val2'}
+        self.cf.insert(key, columns)
+
+        assert_equal(hedged_cf.get(key), columns)
+        assert_equal(hedged_cf.multiget([key, 'missing']), {key: columns})
+        assert_equal(list(hedged_cf.get_range(start=key, finish=key)),
+                     [(key, columns)])
+        assert_raises(NotFoundException, hedged_cf.get, 'missing')
+        assert_equal(hedge.calls, 4)
+
+    def test_raw(self):
+        key = 'TestColumnFamily.test_raw'
+        columns = {'1': 'val1', '2': 'val2'}
+        self.cf.insert(key, columns)
+
+        assert_equal(self.cf.get(key, raw=True), [('1', 'val1'), ('2', 'val2')])
+        assert_equal(self.cf.get('missing', raw=True), [])
+        for name, value, timestamp in self.cf.get(key, raw=True, include_timestamp=True):
+            assert_equal(columns[name], value)
+        assert_equal(self.cf.multiget([key, 'missing'], raw=True),
+                     {key: [('1', 'val1'), ('2', 'val2')], 'missing': []})
+        assert_equal(list(self.cf.get_range(start=key, finish=key, raw=True)),
+                     [(key, [('1', 'val1'), ('2', 'val2')])])
+
+    def test_column_codecs(self):
+        key = 'TestColumnFamily.test_column_codecs'
+        columns = {'big': 'x' * 2000, 'small': 'x', 'plain': 'x' * 2000}
+        codec_cf = ColumnFamily(self.client, 'Standard2',
+                                timestamp=self.timestamp,
+                                column_codecs={'big': Compressed(),
+                                               'small': Compressed()})
+        codec_cf.insert(key, columns)
+        assert_equal(codec_cf.get(key), columns)
+
+        packed = self.cf.get(key)
+        assert len(packed['big']) < 100
+        assert_equal(packed['small'], '\x00x')
+        assert_equal(packed['plain'], columns['plain'])
+
+        # Unicode values come back as unicode, whether compressed or not
+        text = {'big': u'caf\xe9 ' * 500, 'small': u'\u2603'}
+        codec_cf.insert(key, text)
+        for name, value in codec_cf.get(key, columns=text.keys()).iteritems():
+            assert isinstance(value, unicode)
+            assert_equal(value, text[name])
+
+    def test_column_codecs_long_names(self):
+        key = 'TestColumnFamily.test_column_codecs_long_names'
+        columns = {5: 'x' * 2000, 6: 'x' * 2000}
+        for direct_writes in (False, True):
+            codec_cf = ColumnFamily(self.client, 'StdLong',
+                                    direct_writes=direct_writes,
+                                    column_codecs={5: Compressed()})
+            codec_cf.insert(key, columns)
+            assert_equal(codec_cf.get(key), columns)
+
+            packed = ColumnFamily(self.client, 'StdLong',
+                                  autopack_values=False).get(key)
+            assert len(packed[5]) < 100
+            assert_equal(packed[6], columns[6])
+            codec_cf.remove(key)
+
+    def test_insert_buffers(self):
+        key = 'TestColumnFamily.test_insert_buffers'
+        big = 'x' * 100000
+        columns = {'buffer': buffer('abcdef', 3), 'bytearray': bytearray('val2'),
+                   'memoryview': memoryview(big)}
+        expected = {'buffer': 'def', 'bytearray': 'val2', 'memoryview': big}
+        for direct_writes in (False, True):
+            self.cf.remove(key)
+            self.cf.batch(direct_writes=direct_writes).insert(key, columns).send()
+            assert_equal(self.cf.get(key), expected)
+
     def test_remove(self):
         key = 'TestColumnFamily.test_remove'
         columns = {'1': 'val1', '2': 'val2'}
@@ -217,3 +510,11 @@ class TestSuperColumnFamily:
         assert_raises(NotFoundException, self.cf.get, key, super_column='3')
         assert self.cf.multiget([key], super_column='1') == {key: sub12}
         assert list(self.cf.get_range(start=key, finish=key, super_column='1')) == [(key, sub12)]
+
+    def test_xget(self):
+        key = 'TestSuperColumnFamily.test_xget'
+        sub12 = {'sub1': 'val1', 'sub2': 'val2'}
+        columns = {'1': sub12, '2': {'sub3': 'val3'}, '3': {'sub4': 'val4'}}
+        self.cf.insert(key, columns)
+        assert_equal(list(self.cf.xget(key)), sorted(columns.items()))
+        assert_equal(list(self.cf.xget(key, super_column='1')), sorted(sub12.items()))
@@ -2,7 +2,8 @@ from datetime import datetime
 
 from pycassa import index, connect, connect_thread_local, gm_timestamp, ColumnFamily, \
     ColumnFamilyMap, ConsistencyLevel, NotFoundException, String, Int64, \
-    Float64, DateTime, IntString, FloatString, DateTimeString
+    Float64, DateTime, IntString, FloatString, DateTimeString, Compressed, \
+    Int32Array, Int64Array, Float64Array
 from nose.tools import assert_raises
 
 import struct
@@ -31,6 +32,21 @@ class TestIndex(object):
     def __ne__(self, other):
         return self.__dict__ != other.__dict__
 
+class TestCompressed(object):
+    body = Compressed(default='')
+    count = Compressed(Int64(), threshold=0)
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
+
+    def __ne__(self, other):
+        return self.__dict__ != other.__dict__
+
+class TestArrays(object):
+    int32s = Int32Array()
+    int64s = Int64Array()
+    float64s = Float64Array()
+
 class TestEmpty(object):
     pass
 
@@ -49,6 +65,8 @@ class TestColumnFamilyMap:
         self.map = ColumnFamilyMap(TestUTF8, self.cf)
         self.indexed_map = ColumnFamilyMap(TestIndex, self.indexed_cf)
         self.empty_map = ColumnFamilyMap(TestEmpty, self.cf, raw_columns=True)
+        self.compressed_map = ColumnFamilyMap(TestCompressed, self.cf)
+        self.arrays_map = ColumnFamilyMap(TestArrays, self.cf)
         try:
             self.timestamp_n = int(self.cf.get('meta')['timestamp'])
         except NotFoundException:
@@ -96,6 +114,29 @@ class TestColumnFamilyMap:
         assert self.map.get(instance.key) == instance
         assert self.empty_map.get(instance.key).raw_columns['intstrcol'] == str(instance.intstrcol)
 
+    def test_insert_get_compressed(self):
+        instance = TestCompressed()
+        instance.key = 'TestColumnFamilyMap.test_insert_get_compressed'
+        instance.body = 'body ' * 1000
+        instance.count = 5
+        self.compressed_map.insert(instance)
+        assert self.compressed_map.get(instance.key) == instance
+        assert len(self.cf.get(instance.key)['body']) < 100
+
+    def test_insert_get_arrays(self):
+        instance = TestArrays()
+        instance.key = 'TestColumnFamilyMap.test_insert_get_arrays'
+        instance.int32s = [1, -2, 2**31 - 1]
+        instance.int64s = range(1000)
+        instance.float64s = [0.5, -1.25]
+        self.arrays_map.insert(instance)
+
+        result = self.arrays_map.get(instance.key)
+        assert list(result.int32s) == instance.int32s
+        assert list(result.int64s) == instance.int64s
+        assert list(result.float64s) == instance.float64s
+        assert len(self.cf.get(instance.key)['int64s']) == 8000
+
     def test_insert_get_indexed_slices(self):
         instance = TestIndex()
         instance.key = 'key'
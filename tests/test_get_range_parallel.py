@@ -0,0 +1,102 @@
+from pycassa import ColumnFamily
+from pycassa.cassandra.ttypes import CfDef, Column, ColumnOrSuperColumn, \
+    KeySlice, TokenRange
+
+from nose.tools import assert_equal
+
+from hashlib import md5
+
+def random_token(key):
+    token = int(md5(key).hexdigest(), 16)
+    if token >= 2 ** 127:
+        token = 2 ** 128 - token
+    return token
+
+def in_range(token, start, end):
+    # Token ranges exclude their start and include their end, and wrap
+    # around the ring when the start is not below the end
+    if start < end:
+        return start < token <= end
+    return token > start or token <= end
+
+class FakeRing(object):
+    """A client for a RandomPartitioner ring of three nodes."""
+
+    keyspace = 'Keyspace1'
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.node_tokens = [2 ** 125, 2 ** 126, 2 ** 126 + 2 ** 125]
+        self.key_ranges = []
+
+    def get_keyspace_description(self):
+        return {'Standard1': CfDef(name='Standard1', column_type='Standard',
+                                   comparator_type='BytesType',
+                                   column_metadata={})}
+
+    def describe_partitioner(self):
+        return 'org.apache.cassandra.dht.RandomPartitioner'
+
+    def describe_ring(self, keyspace):
+        assert_equal(keyspace, 'Keyspace1')
+        tokens = self.node_tokens
+        return [TokenRange(start_token=str(tokens[i - 1]), end_token=str(tokens[i]))
+                for i in range(len(tokens))]
+
+    def _sorted_keys(self, start, end):
+        keys = [key for key in self.keys if in_range(random_token(key), start, end)]
+        # A range that wraps around lists the keys past its start first
+        keys.sort(key=lambda key: (random_token(key) <= start, random_token(key)))
+        return keys
+
+    def describe_splits(self, column_family, start_token, end_token, keys_per_split):
+        start, end = int(start_token), int(end_token)
+        keys = self._sorted_keys(start, end)
+        # Split exactly on the tokens of keys, so that the key on a boundary
+        # must end up in the range below it and only there
+        tokens = [start_token]
+        for i in range(keys_per_split - 1, len(keys) - 1, keys_per_split):
+            tokens.append(str(random_token(keys[i])))
+        tokens.append(end_token)
+        return tokens
+
+    def get_range_slices(self, column_parent, predicate, key_range, consistency_level):
+        self.key_ranges.append(key_range)
+        assert key_range.start_key is None and key_range.start_token is not None
+        keys = self._sorted_keys(int(key_range.start_token), int(key_range.end_token))
+        return [KeySlice(key=key, columns=[ColumnOrSuperColumn(
+                    column=Column(name='col', value=key, timestamp=0))])
+                for key in keys[:key_range.count]]
+
+class TestGetRangeParallel:
+
+    def setUp(self):
+        self.keys = ['key%d' % i for i in range(100)]
+        self.client = FakeRing(self.keys)
+        self.cf = ColumnFamily(self.client, 'Standard1', buffer_size=4)
+
+    def check_rows(self, rows):
+        assert_equal(sorted(key for key, columns in rows), sorted(self.keys))
+        for key, columns in rows:
+            assert_equal(columns, {'col': key})
+
+    def test_node_ranges(self):
+        self.check_rows(list(self.cf.get_range_parallel()))
+        starts = set(key_range.start_token for key_range in self.client.key_ranges)
+        for token in self.client.node_tokens:
+            assert str(token) in starts
+
+    def test_splits(self):
+        self.check_rows(list(self.cf.get_range_parallel(keys_per_split=7)))
+        ranges = self.cf._get_token_ranges(7)
+        assert len(ranges) > len(self.client.node_tokens)
+        # The ranges cover the ring without overlapping
+        for key in self.keys:
+            token = random_token(key)
+            assert_equal(len([r for r in ranges
+                              if in_range(token, int(r[0]), int(r[1]))]), 1)
+
+    def test_page_boundaries(self):
+        # Pages end on a key, and the next page starts from its token
+        self.cf.buffer_size = 1
+        self.check_rows(list(self.cf.get_range_parallel(keys_per_split=3)))
@@ -0,0 +1,100 @@
+from pycassa.hedging import HedgePolicy
+from pycassa.cassandra.ttypes import TimedOutException
+
+from nose.tools import assert_raises, assert_equal
+
+import threading
+import time
+
+class FakeClient(object):
+
+    def __init__(self, latency, fail=False, name=None):
+        self.latency = latency
+        self.fail = fail
+        self.name = name
+        self.calls = 0
+        self.finished = 0
+
+    def read(self, key):
+        self.calls += 1
+        time.sleep(self.latency)
+        self.finished += 1
+        if self.fail:
+            raise TimedOutException()
+        if self.name is not None:
+            return (self.name, key)
+        return key
+
+def read(key, client=None):
+    return client.read(key)
+
+class TestHedgePolicy:
+
+    def test_fast_reads_not_hedged(self):
+        # More readers than workers, none of them slow
+        primary = FakeClient(0.05)
+        backup = FakeClient(0.05)
+        hedge = HedgePolicy(backup, delay=0.2)
+        results = []
+        def run(i):
+            results.append(hedge.call(primary, read, i))
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert_equal(sorted(results), range(32))
+        assert_equal(hedge.calls, 32)
+        assert_equal(hedge.hedged, 0)
+        assert_equal(backup.calls, 0)
+
+    def test_slow_read_answered_by_hedge(self):
+        # The first request succeeds, but only long after the delay
+        primary = FakeClient(0.5, name='primary')
+        hedge = HedgePolicy(FakeClient(0.01, name='backup'), delay=0.02)
+        started = time.time()
+        assert_equal(hedge.call(primary, read, 'key'), ('backup', 'key'))
+        assert time.time() - started < 0.25
+        assert_equal(primary.finished, 0)
+        assert_equal((hedge.calls, hedge.hedged, hedge.won), (1, 1, 1))
+
+    def test_hedge_loses(self):
+        # The hedge is sent, but the first request still answers first
+        backup = FakeClient(0.5, name='backup')
+        hedge = HedgePolicy(backup, delay=0.02)
+        assert_equal(hedge.call(FakeClient(0.05, name='primary'), read, 'key'),
+                     ('primary', 'key'))
+        assert_equal(backup.calls, 1)
+        assert_equal((hedge.hedged, hedge.won), (1, 0))
+
+    def test_first_requests_reuse_workers(self):
+        # Reads made one after another share one thread, and its connection
+        hedge = HedgePolicy(FakeClient(0), delay=1)
+        for i in range(5):
+            assert_equal(hedge.call(FakeClient(0), read, i), i)
+        assert_equal(len(hedge._primaries._threads), 1)
+
+    def test_failed_read_answered_by_hedge(self):
+        hedge = HedgePolicy(FakeClient(0.01), delay=0.01)
+        assert_equal(hedge.call(FakeClient(0.1, fail=True), read, 'key'), 'key')
+        assert_equal((hedge.hedged, hedge.won), (1, 1))
+
+    def test_errors(self):
+        # A read that fails before the delay is not sent again
+        backup = FakeClient(0.01)
+        hedge = HedgePolicy(backup, delay=1)
+        assert_raises(TimedOutException, hedge.call,
+                      FakeClient(0, fail=True), read, 'key')
+        assert_equal(backup.calls, 0)
+
+        hedge = HedgePolicy(FakeClient(0.01, fail=True), delay=0.01)
+        assert_raises(TimedOutException, hedge.call,
+                      FakeClient(0.1, fail=True), read, 'key')
+        assert_equal((hedge.hedged, hedge.won), (1, 0))
+
+    def test_percentile(self):
+        hedge = HedgePolicy(FakeClient(0), delay=1, percentile=50,
+                            min_samples=5, min_delay=0.001)
+        for i in range(5):
+            hedge.call(FakeClient(0.01), read, i)
+        assert 0.01 <= hedge.current_delay() < 0.1
@@ -0,0 +1,54 @@
+from pycassa import connect, ColumnFamily
+from pycassa.timeseries import TimeSeries
+from pycassa.types import TimeSeriesChunk
+
+from nose.tools import assert_raises, assert_equal
+
+import struct
+
+class TestTimeSeries:
+    def setUp(self):
+        credentials = {'username': 'jsmith', 'password': 'havebadpass'}
+        self.client = connect('Keyspace1', credentials=credentials)
+        self.cf = ColumnFamily(self.client, 'TimeSeries1')
+        self.series = TimeSeries(self.cf, 3600, page_size=2)
+        self.cf.truncate()
+
+    def test_chunk(self):
+        chunk = TimeSeriesChunk()
+        points = [(0, 1.0), (60, 1.0), (120, 2.5), (181, -3.0), (181, 1e100)]
+        assert_equal(chunk.unpack(chunk.pack(points)), points)
+        assert_equal(chunk.unpack(chunk.pack([])), [])
+        assert_raises(ValueError, chunk.pack, [(60, 1.0), (0, 1.0)])
+        assert_raises(TypeError, chunk.pack, [(0.5, 1.0)])
+
+    def test_write_read(self):
+        key = 'TestTimeSeries.test_write_read'
+        points = [(1290000000 + i * 60, float(i % 5)) for i in xrange(600)]
+        writer = self.series.writer(key)
+        for timestamp, value in points:
+            writer.append(timestamp, value)
+        writer.close()
+        assert_raises(ValueError, writer.append, 0, 1.0)
+
+        assert_equal(self.cf.get_count(key), 11)
+        assert_equal(self.series.get(key), points)
+        assert_equal(self.series.get(key, start=points[100][0], finish=points[300][0]),
+                     points[100:301])
+        assert_equal(self.series.get('TestTimeSeries.missing'), [])
+
+    def test_packed_names(self):
+        key = 'TestTimeSeries.test_packed_names'
+        points = [(i * 600, float(i)) for i in xrange(50)]
+        cf = ColumnFamily(self.client, 'TimeSeries1', autopack_names=False,
+                          autopack_values=False)
+        series = TimeSeries(cf, 3600, page_size=2)
+        series.put(key, points)
+        assert_equal(series.get(key), points)
+        assert_equal(series.get(key, start=3000, finish=9000), points[5:16])
+        assert_equal(self.series.get(key), points)
+        assert_equal(cf.get(key, column_count=1).keys(), [struct.pack('>q', 0)])
+
+    def test_comparator(self):
+        assert_raises(ValueError, TimeSeries,
+                      ColumnFamily(self.client, 'Standard2'), 3600)
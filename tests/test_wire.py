@@ -0,0 +1,27 @@
+from thrift.transport import TTransport
+from thrift.protocol import TBinaryProtocol
+
+from pycassa.wire import Client, encode_column_mutations
+
+from nose.tools import assert_equal
+
+class WrappedFramedTransport(TTransport.TFramedTransport):
+    pass
+
+def write_batch(transport_class):
+    buf = TTransport.TMemoryBuffer()
+    client = Client(TBinaryProtocol.TBinaryProtocol(transport_class(buf)))
+    client.recv_batch_mutate = lambda: None
+    mutations = encode_column_mutations([('a', 'x' * 100), ('b', 'y')], 1)
+    client.batch_mutate_direct({'key': {'Standard1': mutations,
+                                        'Standard2': mutations}}, 1)
+    return buf.getvalue()
+
+class TestWire:
+
+    def test_batch_mutate_frames(self):
+        # Frames written straight to the transport beneath the framed
+        # transport match those written through it, which other transport
+        # classes fall back to
+        assert_equal(write_batch(TTransport.TFramedTransport),
+                     write_batch(WrappedFramedTransport))
@@ -0,0 +1,35 @@
+from pycassa.workers import Batcher
+
+from nose.tools import assert_equal
+
+import threading
+import time
+
+def double(items):
+    return dict((item, item * 2) for item in items)
+
+class TestBatcher:
+
+    def test_window(self):
+        batcher = Batcher(double, window=0.05)
+        started = time.time()
+        assert_equal(batcher.call('group', 1), 2)
+        assert time.time() - started >= 0.05
+        assert_equal(batcher.calls, 1)
+
+    def test_full_batch(self):
+        # The thread that starts a batch returns as soon as it is filled,
+        # long before the window ends
+        batcher = Batcher(double, window=5, max_items=4)
+        results = {}
+        def run(item):
+            results[item] = batcher.call('group', item)
+        started = time.time()
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.time() - started < 1
+        assert_equal(results, {0: 0, 1: 2, 2: 4, 3: 6})
+        assert_equal((batcher.calls, batcher.items), (1, 4))